@@ -10,14 +10,30 @@ PDF展示应用程序主入口
 """
 
 import sys
+import logging
+from pathlib import Path
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
 
 from ui.main_window import MainWindow
 
+# 应用程序全局样式表
+STYLE_SHEET_PATH = Path(__file__).resolve().parent / "resources" / "main.qss"
+
+
+def load_style_sheet(app):
+    """加载全局样式表，整个进程只解析一次"""
+    try:
+        app.setStyleSheet(STYLE_SHEET_PATH.read_text(encoding="utf-8"))
+    except OSError as e:
+        logging.getLogger(__name__).warning("⚠️ 无法加载样式表: %s", e)
+
 
 def main():
     """主函数"""
+    # 日志默认INFO级别，逐张图片的调试信息不会被格式化输出
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
     app = QApplication(sys.argv)
     app.setApplicationName("PDF页面选择器")
     app.setOrganizationName("PDF Tools")
@@ -26,6 +42,9 @@ def main():
     font = QFont("SF Pro Display", 12)  # macOS系统字体
     app.setFont(font)
     
+    # 设置主题样式
+    load_style_sheet(app)
+    
     # 创建主窗口
     main_window = MainWindow()
     main_window.show()
@@ -4,67 +4,388 @@ PDF数据模型
 """
 
 from PyQt5.QtWidgets import QListWidgetItem
-from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage, QIcon
+from PyQt5.QtCore import Qt, QThread, QMutex, QObject, QRunnable, pyqtSignal
+from PyQt5.QtGui import QImage, QIcon
 import fitz
 import os
+import re
+import logging
+import shutil
 import tempfile
+import time
+import threading
 import datetime
+import hashlib
 from pathlib import Path
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from models.thumbnail_cache import thumbnail_path, write_thumbnail
+
+log = logging.getLogger(__name__)
+
+
+# 临时目录中识别为图片的文件扩展名
+TEMP_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.tiff', '.bmp')
+
+# 页码范围格式，如 "1,3,5-7,10"，按逗号拆分后逐项匹配
+_PAGE_RANGE_RE = re.compile(r'\s*(\d+)\s*(?:-\s*(\d+)\s*)?')
+
+# 导出图片文件名格式: {文档名}_第{页码}页_{%Y%m%d_%H%M%S}.{扩展名}
+_EXPORT_NAME_RE = re.compile(r'_第(\d+)页_(\d{8}_\d{6})\.\w+$')
+
+
+def _temp_file_sort_key(entry):
+    """临时文件排序键: (时间戳, 页码, 文件名)
+
+    文件名中的时间戳为秒级精度，同一批导出内再按页码排序；
+    不符合命名格式的文件才回退到读取修改时间。
+    """
+    match = _EXPORT_NAME_RE.search(entry.name)
+    if match:
+        return (match.group(2), int(match.group(1)), entry.name)
+    mtime = time.strftime("%Y%m%d_%H%M%S", time.localtime(entry.stat().st_mtime))
+    return (mtime, 0, entry.name)
+
+
+def pixmap_to_qimage(pix):
+    """由 PyMuPDF 像素图的原始像素数据构建QImage，避免PNG编码/解码"""
+    return _samples_to_qimage((pix.width, pix.height, pix.stride, pix.alpha, pix.samples))
+
+
+def _render_preview(get_doc, page_num, target_width, cache_path=None):
+    """
+    按预览尺寸渲染页面，返回 (宽, 高, 每行字节数, 是否含透明通道, 像素数据)
+    
+    参数:
+        get_doc (callable): 获取文档句柄的函数，命中磁盘缓存时不调用
+        page_num (int): 页码 (从0开始)
+        target_width (int): 预览目标宽度(像素)
+        cache_path (Path): 磁盘缩略图缓存路径，None表示不缓存
+    """
+    pix = None
+    if cache_path is not None and cache_path.exists():
+        try:
+            pix = fitz.Pixmap(str(cache_path))
+        except Exception as e:
+            log.warning("⚠️ 读取缩略图缓存失败: %s", e)
+    
+    if pix is None:
+        page = get_doc()[page_num]
+        # 按预览尺寸渲染页面，避免生成远大于显示尺寸的图片
+        scale = PDFLoader.preview_scale(page, target_width)
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+        if cache_path is not None:
+            write_thumbnail(cache_path, pix.save)
+    return pix.width, pix.height, pix.stride, pix.alpha, pix.samples
+
+
+# 工作进程内缓存的文档句柄 (每个进程各自打开一次)
+_process_docs = {}
+
+
+def _process_doc(pdf_path):
+    """获取工作进程内缓存的文档句柄"""
+    doc = _process_docs.get(pdf_path)
+    if doc is None:
+        doc = _process_docs[pdf_path] = fitz.open(pdf_path)
+    return doc
+
+
+def _render_preview_in_process(pdf_path, target_width, doc_key, cache_zoom, page_num):
+    """在工作进程中渲染页面预览，结果以原始像素数据传回"""
+    return _render_preview(partial(_process_doc, pdf_path), page_num, target_width,
+                           thumbnail_path(doc_key, page_num, cache_zoom))
+
+
+def _samples_to_qimage(samples):
+    """由 _render_preview 返回的原始像素数据构建QImage"""
+    width, height, stride, alpha, data = samples
+    fmt = QImage.Format_RGBA8888 if alpha else QImage.Format_RGB888
+    # copy() 使QImage脱离原始缓冲区，防止缓冲区释放后悬空
+    return QImage(data, width, height, stride, fmt).copy()
 
 
 class PDFPageItem(QListWidgetItem):
-    """PDF页面项"""
+    """PDF页面项
+
+    注意: 由QImage构建QPixmap时统一使用 QPixmap.fromImage(qimg)，
+    不要使用 QPixmap(qimg) 构造方式（Python绑定中为模拟实现，速度较慢）。
+    """
     def __init__(self, page_num, pixmap):
         super().__init__()
         self.page_num = page_num
         self.pixmap = pixmap
         self.setText(f"第 {page_num + 1} 页")
+        # 页码同时存入 Qt.UserRole，遍历列表项时可直接读取，无需类型检查
+        self.setData(Qt.UserRole, page_num)
 
 
 class PDFLoader(QThread):
     """PDF加载线程"""
-    page_loaded = pyqtSignal(int, QPixmap)
+    pages_loaded = pyqtSignal(list)  # [(页码, QImage), ...]，QPixmap只能在界面线程创建
     loading_finished = pyqtSignal()
     loading_progress = pyqtSignal(int, int)
     
-    def __init__(self, pdf_path):
+    # 预览渲染缩放比例范围
+    MIN_RENDER_SCALE = 0.5
+    MAX_RENDER_SCALE = 2.0
+    DEFAULT_RENDER_SCALE = 1.5
+    
+    # 批量发送已加载页面：达到页数或间隔(秒)任一条件即发送
+    BATCH_SIZE = 16
+    BATCH_INTERVAL = 0.05
+    
+    # 页数达到该值时使用多进程渲染 (小文件启动进程的开销大于收益)
+    PROCESS_POOL_MIN_PAGES = 32
+    MAX_PROCESS_WORKERS = 4
+    
+    def __init__(self, pdf_path, target_width=None, max_workers=None, doc=None, doc_lock=None,
+                 doc_key=None, cache_zoom=None):
         super().__init__()
         self.pdf_path = pdf_path
-        self.doc = None
+        self.target_width = target_width  # 预览目标宽度(像素)，None时使用默认缩放
+        # 磁盘缩略图缓存：文档缓存键和预览对应的缩放档位，任一为None时不缓存
+        self.doc_key = doc_key
+        self.cache_zoom = cache_zoom
+        self.doc = doc  # 已打开的共享文档，访问时需持有 doc_lock
+        self.doc_lock = doc_lock
+        self._owns_doc = doc is None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # 同时在途的渲染任务上限，避免大文件一次性占用过多内存
+        self.max_outstanding = self.max_workers * 2
+        
+        # 每个工作线程独立的文档句柄（MuPDF文档不可跨线程共享）
+        self._local = threading.local()
+        self._worker_docs = []
+        self._worker_docs_lock = threading.Lock()
+        
+    def _get_worker_doc(self):
+        """获取当前工作线程的文档句柄"""
+        doc = getattr(self._local, "doc", None)
+        if doc is None:
+            doc = fitz.open(self.pdf_path)
+            self._local.doc = doc
+            with self._worker_docs_lock:
+                self._worker_docs.append(doc)
+        return doc
+        
+    @classmethod
+    def preview_scale(cls, page, target_width):
+        """根据目标显示宽度计算页面渲染缩放比例"""
+        if not target_width or page.rect.width <= 0:
+            return cls.DEFAULT_RENDER_SCALE
+        scale = target_width / page.rect.width
+        return max(cls.MIN_RENDER_SCALE, min(scale, cls.MAX_RENDER_SCALE))
+        
+    def _render_page(self, page_num):
+        """在工作线程中渲染单个页面"""
+        return _render_preview(self._get_worker_doc, page_num, self.target_width,
+                               thumbnail_path(self.doc_key, page_num, self.cache_zoom))
+        
+    def _create_executor(self, total_pages):
+        """创建渲染执行器，返回 (执行器, 渲染函数)"""
+        if total_pages >= self.PROCESS_POOL_MIN_PAGES:
+            # 大文件使用多进程并行渲染，不受GIL限制
+            workers = min(self.max_workers, self.MAX_PROCESS_WORKERS)
+            render = partial(_render_preview_in_process, self.pdf_path, self.target_width,
+                             self.doc_key, self.cache_zoom)
+            return ProcessPoolExecutor(max_workers=workers), render
+        return ThreadPoolExecutor(max_workers=self.max_workers), self._render_page
         
     def run(self):
         try:
-            self.doc = fitz.open(self.pdf_path)
-            total_pages = len(self.doc)
+            if self._owns_doc:
+                self.doc = fitz.open(self.pdf_path)
+                total_pages = len(self.doc)
+            else:
+                # 复用已解析的共享文档获取页数，避免重复解析
+                self.doc_lock.lock()
+                try:
+                    total_pages = len(self.doc)
+                finally:
+                    self.doc_lock.unlock()
             
-            for page_num in range(total_pages):
-                page = self.doc[page_num]
-                # 渲染页面为图片，设置适当的缩放比例
-                mat = fitz.Matrix(1.5, 1.5)  # 缩放比例
-                pix = page.get_pixmap(matrix=mat)
+            # 按页码顺序提交任务，窗口内并行渲染，按顺序发送结果
+            executor, render = self._create_executor(total_pages)
+            with executor:
+                pending = deque()
+                next_page = 0
+                batch = []
+                last_emit = time.monotonic()
                 
-                # 转换为QPixmap
-                img_data = pix.tobytes("png")
-                qimg = QImage()
-                qimg.loadFromData(img_data)
-                pixmap = QPixmap.fromImage(qimg)
+                while next_page < total_pages or pending:
+                    while next_page < total_pages and len(pending) < self.max_outstanding:
+                        pending.append((next_page, executor.submit(render, next_page)))
+                        next_page += 1
+                    
+                    page_num, future = pending.popleft()
+                    batch.append((page_num, _samples_to_qimage(future.result())))
+                    
+                    # 多页合并为一次跨线程信号，界面一次性添加
+                    now = time.monotonic()
+                    if len(batch) >= self.BATCH_SIZE or now - last_emit > self.BATCH_INTERVAL:
+                        self.pages_loaded.emit(batch)
+                        self.loading_progress.emit(page_num + 1, total_pages)
+                        batch = []
+                        last_emit = now
                 
-                self.page_loaded.emit(page_num, pixmap)
-                self.loading_progress.emit(page_num + 1, total_pages)
+                if batch:
+                    self.pages_loaded.emit(batch)
+                    self.loading_progress.emit(total_pages, total_pages)
                 
             self.loading_finished.emit()
             
         except Exception as e:
-            print(f"加载PDF错误: {e}")
+            log.error("加载PDF错误: %s", e)
+        finally:
+            if self._owns_doc and self.doc:
+                self.doc.close()
+                self.doc = None
+            with self._worker_docs_lock:
+                for doc in self._worker_docs:
+                    doc.close()
+                self._worker_docs.clear()
+
+
+# 线程池工作线程各自缓存的文档句柄 (MuPDF文档不可跨线程共享)
+_thread_docs = threading.local()
+
+
+def _thread_local_doc(pdf_path):
+    """获取当前线程缓存的文档句柄，文档路径或修改时间变化时重新打开"""
+    key = (pdf_path, os.path.getmtime(pdf_path))
+    if getattr(_thread_docs, "key", None) != key:
+        doc = getattr(_thread_docs, "doc", None)
+        _thread_docs.doc = _thread_docs.key = None
+        if doc is not None:
+            doc.close()
+        _thread_docs.doc = fitz.open(pdf_path)
+        _thread_docs.key = key
+    return _thread_docs.doc
+
+
+def render_page_from_path(pdf_path, page_num, dpi=300):
+    """
+    使用当前线程的文档句柄渲染页面，不占用共享文档及其锁
+    
+    参数:
+        pdf_path (str): PDF文件路径
+        page_num (int): 页码 (从0开始，内部使用)
+        dpi (int): 分辨率，默认300
+    
+    返回:
+        fitz.Pixmap: 渲染结果
+    """
+    zoom = dpi / 72.0  # 72是默认DPI
+    return _thread_local_doc(pdf_path)[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+
+def save_pixmap(pix, output_path, image_format="png"):
+    """按指定格式保存像素图 (剪贴板临时文件不需要高压缩率，优先保存速度)"""
+    if image_format not in PDFDocument.IMAGE_FORMATS:
+        raise ValueError(f"不支持的图片格式: {image_format}")
+    _, pil_format, save_options = PDFDocument.IMAGE_FORMATS[image_format]
+    pix.pil_save(output_path, format=pil_format, **save_options)
+
+
+class PageExportSignals(QObject):
+    """页面导出任务信号"""
+    page_exported = pyqtSignal(int, str)  # 页码, 图片路径
+    page_failed = pyqtSignal(int)  # 页码
+
+
+class PageExportTask(QRunnable):
+    """在线程池中导出单个页面为图片"""
+    
+    def __init__(self, pdf_path, page_num, dpi, output_path, image_format="png"):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.page_num = page_num
+        self.dpi = dpi
+        self.output_path = output_path
+        self.image_format = image_format
+        self.signals = PageExportSignals()
+        
+    def run(self):
+        try:
+            # 复用当前工作线程的文档句柄，无需每页重新解析文档
+            doc = _thread_local_doc(self.pdf_path)
+            zoom = self.dpi / 72.0  # 72是默认DPI
+            pix = doc[self.page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            save_pixmap(pix, self.output_path, self.image_format)
+        except Exception as e:
+            log.error("❌ 转换页面 %s 失败: %s", self.page_num + 1, e)
+            self.signals.page_failed.emit(self.page_num)
+            return
+        
+        self.signals.page_exported.emit(self.page_num, self.output_path)
+
+
+class PageRenderSignals(QObject):
+    """页面预览渲染任务信号"""
+    page_rendered = pyqtSignal(int, int, QImage)  # 请求编号, 页码, 图像
+
+
+class PageRenderTask(QRunnable):
+    """在线程池中按目标尺寸渲染单个页面预览"""
+    
+    def __init__(self, generation, pdf_path, page_num, target_size, cache_path=None):
+        super().__init__()
+        self.generation = generation
+        self.pdf_path = pdf_path
+        self.page_num = page_num
+        self.target_size = target_size  # (宽, 高)，按比例缩放至恰好放入该尺寸
+        self.cache_path = cache_path  # 磁盘缩略图缓存路径，None表示不缓存
+        self.signals = PageRenderSignals()
+        
+    def run(self):
+        # 优先读取磁盘缓存，省去PDF渲染
+        if self.cache_path is not None and self.cache_path.exists():
+            qimg = QImage(str(self.cache_path))
+            if not qimg.isNull():
+                self.signals.page_rendered.emit(self.generation, self.page_num, qimg)
+                return
+        
+        try:
+            # 复用当前工作线程的文档句柄，无需每页重新解析文档
+            page = _thread_local_doc(self.pdf_path)[self.page_num]
+            # 直接渲染为显示尺寸，无需再由Qt缩放
+            width, height = self.target_size
+            scale = min(width / page.rect.width, height / page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+            qimg = pixmap_to_qimage(pix)
+        except Exception as e:
+            log.error("❌ 渲染页面 %s 失败: %s", self.page_num + 1, e)
+            return
+        
+        self.signals.page_rendered.emit(self.generation, self.page_num, qimg)
+        
+        if self.cache_path is not None:
+            write_thumbnail(self.cache_path, pix.save)
 
 
 class PDFDocument:
     """PDF文档模型"""
     
+    # 进程内共享的临时根目录
+    _shared_temp_root = None
+    
+    # 导出图片格式: 扩展名, PIL格式名, 保存参数
+    IMAGE_FORMATS = {
+        "png": (".png", "PNG", {"compress_level": 1}),  # 最快的Deflate压缩级别
+        "jpeg": (".jpg", "JPEG", {"quality": 85, "optimize": False}),
+        "webp": (".webp", "WEBP", {"quality": 85}),
+    }
+    
     def __init__(self):
         self.pdf_path = None
         self.doc = None
+        self.doc_lock = QMutex()  # MuPDF文档访问需串行化
+        self._cached_key = None  # 已打开文档的 (路径, 修改时间)
+        self._export_stem = None  # 导出文件名前缀，每批导出计算一次
+        self._export_timestamp = None
         self.selected_pages = []
         self.temp_files = []
         self.temp_dir = None
@@ -77,9 +398,28 @@ class PDFDocument:
     def load_document(self, pdf_path):
         """加载PDF文档"""
         self.pdf_path = pdf_path
-        if self.doc:
-            self.doc.close()
-        self.doc = fitz.open(pdf_path)
+        self._export_stem = None
+        self._export_timestamp = None
+        
+        # 切换到该文档对应的临时子目录，临时文件列表随之重新扫描
+        if self.temp_dir:
+            self.create_temp_directory(pdf_path)
+            self.refresh_temp_files()
+        
+        cache_key = (pdf_path, os.path.getmtime(pdf_path))
+        
+        # 同一文件未修改时复用已解析的文档
+        if self.doc and cache_key == self._cached_key:
+            return
+        
+        self.doc_lock.lock()
+        try:
+            if self.doc:
+                self.doc.close()
+            self.doc = fitz.open(pdf_path)
+            self._cached_key = cache_key
+        finally:
+            self.doc_lock.unlock()
         
     def get_page_count(self):
         """获取页面数量"""
@@ -87,22 +427,75 @@ class PDFDocument:
         
     def parse_page_range(self, range_str):
         """解析页码范围字符串"""
-        pages = []
-        parts = range_str.split(',')
-        
-        for part in parts:
-            part = part.strip()
-            if '-' in part:
-                start, end = part.split('-', 1)
-                start = int(start.strip())
-                end = int(end.strip())
-                pages.extend(range(start, end + 1))
-            else:
-                pages.append(int(part))
+        # 逐项校验并解析，只扫描一遍，直接写入集合去重
+        pages = set()
+        for token in range_str.split(','):
+            match = _PAGE_RANGE_RE.fullmatch(token)
+            if not match:
+                raise ValueError(f"无效的页码范围: {range_str}")
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else start
+            pages.update(range(start, end + 1))
                 
-        return sorted(list(set(pages)))  # 去重并排序
+        return sorted(pages)
+        
+    def render_page_pixmap(self, page_num, dpi=300):
+        """
+        将PDF的指定页面渲染为像素图
+        
+        参数:
+            page_num (int): 页码 (从0开始，内部使用)
+            dpi (int): 分辨率，默认300
+        
+        返回:
+            fitz.Pixmap: 渲染结果
+        """
+        if not self.doc:
+            raise ValueError("PDF文档未加载")
+        
+        # 检查页码范围
+        if page_num < 0 or page_num >= len(self.doc):
+            raise ValueError(f"页码 {page_num} 超出范围 (0-{len(self.doc)-1})")
+        
+        # 计算缩放比例 (DPI转换)
+        zoom = dpi / 72.0  # 72是默认DPI
+        mat = fitz.Matrix(zoom, zoom)
+        
+        self.doc_lock.lock()
+        try:
+            return self.doc[page_num].get_pixmap(matrix=mat)
+        finally:
+            self.doc_lock.unlock()
+        
+    def begin_export(self):
+        """开始一批导出，预先计算文件名中的文档名和时间戳"""
+        self._export_stem = Path(self.pdf_path).stem if self.pdf_path else "pdf"
+        self._export_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+    def get_export_path(self, page_num, image_format="png"):
+        """
+        生成导出图片的输出路径
+        
+        参数:
+            page_num (int): 页码 (从0开始，内部使用)
+            image_format (str): 图片格式 "png" / "jpeg" / "webp"
+        
+        返回:
+            str: 临时目录中的输出路径
+        """
+        if image_format not in self.IMAGE_FORMATS:
+            raise ValueError(f"不支持的图片格式: {image_format}")
+        if not self.temp_dir:
+            raise ValueError("临时目录未创建")
+        
+        if self._export_timestamp is None:
+            self.begin_export()
+        extension = self.IMAGE_FORMATS[image_format][0]
+        return os.path.join(
+            self.temp_dir,
+            f"{self._export_stem}_第{page_num+1}页_{self._export_timestamp}{extension}")
         
-    def pdf_page_to_image(self, page_num, output_path=None, dpi=300):
+    def pdf_page_to_image(self, page_num, output_path=None, dpi=300, image_format="png"):
         """
         将PDF的指定页面转换为图片
         
@@ -110,6 +503,7 @@ class PDFDocument:
             page_num (int): 页码 (从0开始，内部使用)
             output_path (str): 输出图片路径，如果为None则自动生成
             dpi (int): 分辨率，默认300
+            image_format (str): 图片格式 "png" / "jpeg" / "webp"，默认png
         
         返回:
             str: 保存的图片路径
@@ -118,45 +512,40 @@ class PDFDocument:
             if not self.doc:
                 raise ValueError("PDF文档未加载")
             
-            # 检查页码范围
-            if page_num < 0 or page_num >= len(self.doc):
-                raise ValueError(f"页码 {page_num} 超出范围 (0-{len(self.doc)-1})")
-            
-            # 获取指定页面
-            page = self.doc[page_num]
-            
-            # 计算缩放比例 (DPI转换)
-            zoom = dpi / 72.0  # 72是默认DPI
-            mat = fitz.Matrix(zoom, zoom)
-            
-            # 渲染页面为图片
-            pix = page.get_pixmap(matrix=mat)
-            
             # 生成输出路径
             if output_path is None:
-                if self.temp_dir:
-                    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    pdf_name = Path(self.pdf_path).stem if self.pdf_path else "pdf"
-                    output_path = os.path.join(self.temp_dir, f"{pdf_name}_第{page_num+1}页_{timestamp}.png")
-                else:
-                    raise ValueError("临时目录未创建")
+                output_path = self.get_export_path(page_num, image_format)
+            
+            # 渲染页面为图片
+            pix = self.render_page_pixmap(page_num, dpi)
             
-            # 保存图片
-            pix.save(output_path)
+            save_pixmap(pix, output_path, image_format)
             
             return output_path
             
         except Exception as e:
-            print(f"❌ 转换页面 {page_num+1} 失败: {e}")
+            log.error("❌ 转换页面 %s 失败: %s", page_num+1, e)
             return None
             
-    def create_temp_directory(self):
-        """创建临时目录"""
+    @classmethod
+    def _shared_temp_dir(cls):
+        """获取进程内共享的临时根目录，首次使用时创建"""
+        if cls._shared_temp_root is None or not os.path.isdir(cls._shared_temp_root):
+            cls._shared_temp_root = tempfile.mkdtemp(prefix="pdf_viewer_")
+            log.info("📁 临时目录已创建: %s", cls._shared_temp_root)
+        return cls._shared_temp_root
+        
+    def create_temp_directory(self, pdf_path=None):
+        """创建临时目录 (进程内共享根目录，按PDF路径哈希划分子目录)"""
         try:
-            self.temp_dir = tempfile.mkdtemp(prefix="pdf_viewer_")
-            print(f"📁 临时目录已创建: {self.temp_dir}")
+            temp_dir = self._shared_temp_dir()
+            if pdf_path:
+                digest = hashlib.blake2b(pdf_path.encode(), digest_size=8).hexdigest()
+                temp_dir = os.path.join(temp_dir, digest)
+                os.makedirs(temp_dir, exist_ok=True)
+            self.temp_dir = temp_dir
         except Exception as e:
-            print(f"❌ 创建临时目录失败: {e}")
+            log.error("❌ 创建临时目录失败: %s", e)
             self.temp_dir = None
             
     def refresh_temp_files(self):
@@ -166,22 +555,20 @@ class PDFDocument:
             return
             
         try:
-            # 扫描临时目录中的所有图片文件
-            temp_files = []
-            for file_name in os.listdir(self.temp_dir):
-                if file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.bmp')):
-                    file_path = os.path.join(self.temp_dir, file_name)
-                    if os.path.isfile(file_path):
-                        temp_files.append(file_path)
+            # 扫描临时目录中的所有图片文件 (scandir 复用目录项缓存的文件类型信息)
+            with os.scandir(self.temp_dir) as it:
+                entries = [entry for entry in it
+                           if entry.is_file(follow_symlinks=False)
+                           and entry.name.lower().endswith(TEMP_IMAGE_EXTENSIONS)]
             
-            # 按修改时间排序
-            temp_files.sort(key=lambda x: os.path.getmtime(x))
-            self.temp_files = temp_files
+            # 按生成时间排序 (本程序生成的文件从文件名解析，无需stat)
+            entries.sort(key=_temp_file_sort_key)
+            self.temp_files = [entry.path for entry in entries]
             
-            print(f"🔄 已刷新临时文件列表，共 {len(self.temp_files)} 个文件")
+            log.info("🔄 已刷新临时文件列表，共 %s 个文件", len(self.temp_files))
             
         except Exception as e:
-            print(f"❌ 刷新临时文件列表失败: {e}")
+            log.error("❌ 刷新临时文件列表失败: %s", e)
             self.temp_files = []
     
     def delete_selected_files(self, selected_files):
@@ -189,40 +576,44 @@ class PDFDocument:
         deleted_count = 0
         
         for file_path in selected_files:
+            # 直接删除，不再预先检查文件是否存在
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    deleted_count += 1
-                    print(f"🗑️ 已删除: {os.path.basename(file_path)}")
-                
-                # 从临时文件列表中移除
-                if file_path in self.temp_files:
-                    self.temp_files.remove(file_path)
-                
-            except Exception as e:
-                print(f"❌ 删除文件失败 {file_path}: {e}")
+                os.unlink(file_path)
+                deleted_count += 1
+                log.debug("🗑️ 已删除: %s", os.path.basename(file_path))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.error("❌ 删除文件失败 %s: %s", file_path, e)
+                continue
+            
+            # 从临时文件列表中移除
+            if file_path in self.temp_files:
+                self.temp_files.remove(file_path)
         
-        print(f"🗑️ 删除选中文件完成，已删除 {deleted_count} 个文件")
+        log.info("🗑️ 删除选中文件完成，已删除 %s 个文件", deleted_count)
         return deleted_count
     
     def clear_temp_files(self):
         """清理所有临时文件"""
         deleted_count = 0
         
-        for file_path in self.temp_files[:]:  # 使用切片复制列表
+        remaining_files = []
+        
+        for file_path in self.temp_files:
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    deleted_count += 1
-                    print(f"🗑️ 已删除: {os.path.basename(file_path)}")
-                
-                # 从列表中移除
-                self.temp_files.remove(file_path)
-                
-            except Exception as e:
-                print(f"❌ 删除文件失败 {file_path}: {e}")
+                os.unlink(file_path)
+                deleted_count += 1
+                log.debug("🗑️ 已删除: %s", os.path.basename(file_path))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.error("❌ 删除文件失败 %s: %s", file_path, e)
+                remaining_files.append(file_path)
+        
+        self.temp_files = remaining_files
         
-        print(f"🧹 清空完成，已删除 {deleted_count} 个临时文件")
+        log.info("🧹 清空完成，已删除 %s 个临时文件", deleted_count)
         return deleted_count
     
     def get_temp_files_info(self):
@@ -233,13 +624,17 @@ class PDFDocument:
         total_size = 0
         valid_files = 0
         
-        for file_path in self.temp_files:
-            if os.path.exists(file_path):
-                try:
-                    total_size += os.path.getsize(file_path)
-                    valid_files += 1
-                except:
-                    pass
+        if self.temp_dir and os.path.isdir(self.temp_dir):
+            # 一次扫描目录，使用目录项的stat信息统计大小
+            temp_files = set(self.temp_files)
+            with os.scandir(self.temp_dir) as it:
+                for entry in it:
+                    if entry.path in temp_files:
+                        try:
+                            total_size += entry.stat().st_size
+                            valid_files += 1
+                        except OSError:
+                            pass
         
         # 转换文件大小为可读格式
         if total_size < 1024:
@@ -251,23 +646,29 @@ class PDFDocument:
             
         return f"{valid_files} 个文件，共 {size_str}"
     
+    @classmethod
+    def count_all_temp_files(cls):
+        """统计共享临时根目录中的文件数量 (包括本次运行打开过的所有PDF的子目录)"""
+        temp_root = cls._shared_temp_root
+        if not temp_root or not os.path.isdir(temp_root):
+            return 0
+        return sum(len(files) for _, _, files in os.walk(temp_root))
+    
     def cleanup(self):
         """清理资源"""
         if self.doc:
             self.doc.close()
-            
-        # 清理临时文件
-        for file_path in self.temp_files:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except:
-                pass
-                
-        # 删除临时目录
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                os.rmdir(self.temp_dir)
-                print(f"📁 临时目录已删除: {self.temp_dir}")
-            except:
-                print(f"⚠️ 无法删除临时目录: {self.temp_dir}") 
\ No newline at end of file
+            self.doc = None
+            self._cached_key = None
+        
+        # 一次性删除共享临时目录及其中的所有文件
+        self.temp_files = []
+        self.temp_dir = None
+        temp_root = PDFDocument._shared_temp_root
+        if temp_root:
+            shutil.rmtree(temp_root, ignore_errors=True)
+            if os.path.exists(temp_root):
+                log.warning("⚠️ 无法删除临时目录: %s", temp_root)
+            else:
+                log.info("📁 临时目录已删除: %s", temp_root)
+                PDFDocument._shared_temp_root = None
\ No newline at end of file
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+临时文件列表模型
+"""
+
+import os
+import difflib
+from PyQt5.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject,
+                          QRunnable, pyqtSignal)
+
+
+# 文件是否存在 (bool)
+ExistsRole = Qt.UserRole + 1
+
+
+class TempFilesModel(QAbstractListModel):
+    """临时文件列表模型，按需提供显示数据"""
+    
+    # 差异块超过此数量时整体重置，避免逐块发送插入/删除信号
+    MAX_INCREMENTAL_CHANGES = 8
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._names = []  # 与 _paths 对应的文件名，只在插入时计算
+        self._exists = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._paths)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        
+        row = index.row()
+        file_path = self._paths[row]
+        
+        if role == Qt.DisplayRole:
+            return self._names[row]
+        if role == Qt.UserRole:
+            return file_path
+        if role == ExistsRole:
+            return self._exists[row]
+        return None
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if not self._exists[index.row()]:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+    
+    def set_files(self, paths, exists):
+        """
+        设置文件列表
+        
+        参数:
+            paths (list): 文件路径列表
+            exists (list): 与 paths 对应的文件是否存在
+        """
+        self.beginResetModel()
+        self._paths = list(paths)
+        self._names = [os.path.basename(path) for path in self._paths]
+        self._exists = list(exists)
+        self.endResetModel()
+    
+    def apply_update(self, paths):
+        """
+        增量更新文件列表，只插入/删除发生变化的行
+        
+        参数:
+            paths (list): 新的文件路径列表
+        
+        返回:
+            bool: 列表是否发生变化
+        """
+        paths = list(paths)
+        if paths == self._paths:
+            return False
+        
+        matcher = difflib.SequenceMatcher(None, self._paths, paths, autojunk=False)
+        changes = [op for op in matcher.get_opcodes() if op[0] != 'equal']
+        if len(changes) > self.MAX_INCREMENTAL_CHANGES:
+            # 变化零散时一次性重置，视图只需重新布局一次
+            exists = dict(zip(self._paths, self._exists))
+            self.set_files(paths, [exists.get(path, True) for path in paths])
+            return True
+        
+        # 从后往前应用差异，保证前面的行号不受影响
+        for tag, i1, i2, j1, j2 in reversed(changes):
+            if tag in ('replace', 'delete'):
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._paths[i1:i2]
+                del self._names[i1:i2]
+                del self._exists[i1:i2]
+                self.endRemoveRows()
+            if tag in ('replace', 'insert'):
+                self.beginInsertRows(QModelIndex(), i1, i1 + (j2 - j1) - 1)
+                self._paths[i1:i1] = paths[j1:j2]
+                self._names[i1:i1] = [os.path.basename(path) for path in paths[j1:j2]]
+                self._exists[i1:i1] = [True] * (j2 - j1)
+                self.endInsertRows()
+        
+        return True
+    
+    def update_exists(self, exists):
+        """更新文件存在状态，只通知视图重绘"""
+        exists = list(exists)
+        if len(exists) != len(self._paths) or not self._paths or exists == self._exists:
+            return
+        self._exists = exists
+        self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1),
+                              [ExistsRole])
+    
+    def file_path(self, row):
+        """获取指定行的文件路径"""
+        return self._paths[row]
+
+
+class TempFileProbeSignals(QObject):
+    """文件存在性检测结果信号"""
+    probed = pyqtSignal(int, list)  # 请求编号, 存在状态列表
+
+
+class TempFileProbeTask(QRunnable):
+    """在线程池中检测文件是否存在，每个目录只扫描一次"""
+    
+    def __init__(self, generation, paths):
+        super().__init__()
+        self.generation = generation
+        self.paths = list(paths)
+        self.signals = TempFileProbeSignals()
+        
+    def run(self):
+        existing = set()
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            try:
+                with os.scandir(directory) as it:
+                    existing.update(entry.path for entry in it
+                                    if entry.is_file(follow_symlinks=False))
+            except OSError:
+                pass
+        
+        exists = [path in existing for path in self.paths]
+        self.signals.probed.emit(self.generation, exists)
\ No newline at end of file
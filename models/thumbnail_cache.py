@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+页面缩略图磁盘缓存
+重新打开同一PDF时 (首次加载和缩放时) 直接读取已渲染的缩略图，无需再次渲染
+"""
+
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+# 缓存根目录
+CACHE_DIR = Path.home() / ".cache" / "pdfpaste"
+
+# 预览渲染档位：按不小于当前缩放比例的最小档位渲染，再由Qt缩小显示
+RENDER_BANDS = (1.0, 2.0, 4.0)
+
+# 写入磁盘缓存的缩放档位 (百分比)，与渲染档位一致；超出最高档位时不缓存，限制缓存大小
+ZOOM_BUCKETS = tuple(int(band * 100) for band in RENDER_BANDS)
+
+# 缓存总大小上限 (字节)，新文档建立缓存时按最近使用时间淘汰最旧的文档目录
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# 计算文档缓存键时读取的文件头长度
+_KEY_READ_SIZE = 1 << 20
+
+
+def document_key(pdf_path):
+    """
+    计算文档缓存键 (文件头部内容与文件大小的SHA1)
+    
+    参数:
+        pdf_path (str): PDF文件路径
+    
+    返回:
+        str: 缓存键，文件无法读取时返回None
+    """
+    try:
+        digest = hashlib.sha1()
+        with open(pdf_path, 'rb') as f:
+            digest.update(f.read(_KEY_READ_SIZE))
+        digest.update(str(os.path.getsize(pdf_path)).encode())
+        return digest.hexdigest()
+    except OSError as e:
+        log.warning("⚠️ 无法计算缩略图缓存键: %s", e)
+        return None
+
+
+def thumbnail_path(doc_key, page_num, zoom):
+    """
+    获取缩略图缓存文件路径
+    
+    参数:
+        doc_key (str): 文档缓存键
+        page_num (int): 页码 (从0开始)
+        zoom (float): 缩放比例
+    
+    返回:
+        Path: 缓存文件路径，缩放比例不在缓存档位时返回None
+    """
+    if not doc_key or zoom is None:
+        return None
+    percent = int(round(zoom * 100))
+    if percent not in ZOOM_BUCKETS:
+        return None
+    return CACHE_DIR / doc_key / f"p{page_num}_z{percent}.png"
+
+
+def write_thumbnail(cache_path, save):
+    """
+    写入缩略图缓存：先写入同目录临时文件再替换，其他任务不会读到未写完的文件
+    
+    参数:
+        cache_path (Path): 缓存文件路径
+        save (callable): 按路径保存PNG的函数，如 fitz.Pixmap.save
+    """
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".png")
+        os.close(fd)
+        save(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        log.warning("⚠️ 写入缩略图缓存失败: %s", e)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def touch_document(doc_key):
+    """
+    标记文档缓存为最近使用；首次为该文档建立缓存时先淘汰超出大小上限的旧文档
+    
+    参数:
+        doc_key (str): 文档缓存键
+    """
+    if not doc_key:
+        return
+    doc_dir = CACHE_DIR / doc_key
+    try:
+        if doc_dir.is_dir():
+            os.utime(doc_dir)
+            return
+        prune_cache(MAX_CACHE_BYTES)
+        doc_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        log.warning("⚠️ 更新缩略图缓存目录失败: %s", e)
+
+
+def _dir_size(path):
+    """统计目录中文件的总大小"""
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat().st_size
+            except OSError:
+                pass
+    return total
+
+
+def prune_cache(max_bytes):
+    """
+    按目录修改时间从旧到新删除文档缓存目录，直到总大小不超过上限
+    
+    参数:
+        max_bytes (int): 缓存总大小上限 (字节)
+    """
+    if not CACHE_DIR.is_dir():
+        return
+    
+    doc_dirs = []
+    total = 0
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                size = _dir_size(entry.path)
+                doc_dirs.append((entry.stat().st_mtime, size, entry.path))
+                total += size
+            except OSError:
+                pass
+    
+    doc_dirs.sort()
+    for _, size, path in doc_dirs:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        log.debug("🧹 已淘汰缩略图缓存: %s", path)
@@ -5,92 +5,131 @@
 """
 
 import os
+import queue
+import logging
+import threading
 from PyQt5.QtCore import QTimer
 from services.clipboard_service import ClipboardService
+from models.pdf_model import TEMP_IMAGE_EXTENSIONS, _temp_file_sort_key
+
+log = logging.getLogger(__name__)
 
 
 class AutoCopyService:
     """自动复制粘贴服务类"""
     
-    def __init__(self, temp_dir_getter, interval_getter):
+    # 后台页面尚未渲染完成时的重试间隔 (毫秒)
+    RENDER_RETRY_MS = 50
+    
+    # 迭代器产出该标记表示下一页尚未渲染完成
+    _NOT_READY = object()
+    
+    def __init__(self, temp_dir_getter, interval_getter, pages_getter=None,
+                 pdf_path_getter=None, page_renderer=None):
         self.temp_dir_getter = temp_dir_getter  # 获取临时目录的函数
         self.interval_getter = interval_getter  # 获取时间间隔的函数
+        self.pages_getter = pages_getter  # 获取选中页码的函数 (无临时图片时直接复制页面)
+        self.pdf_path_getter = pdf_path_getter  # 获取当前PDF路径的函数
+        self.page_renderer = page_renderer  # 按 (PDF路径, 页码) 渲染像素图的函数
         
         # 自动遍历相关
         self.auto_copy_timer = QTimer()
         self.auto_copy_timer.timeout.connect(self.process_next_image)
-        self.current_image_index = 0
-        self.images_to_process = []
+        self._image_iter = iter(())  # 待处理图片的迭代器
+        self.processed_count = 0
+        self.total_images = 0
         self.is_auto_processing = False
         
+        # 页面渲染流水线：后台线程预先渲染，粘贴间隔期间并行进行
+        self._render_queue = None
+        self._render_thread = None
+        self._render_stop = None  # 当前流水线的停止标记，每次运行单独创建
+        
     def get_temp_image_files(self):
         """获取临时目录中的所有图片文件"""
         temp_dir = self.temp_dir_getter()
         if not temp_dir or not os.path.exists(temp_dir):
             return []
         
-        image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'}
-        image_files = []
-        
         try:
-            for file in os.listdir(temp_dir):
-                if any(file.lower().endswith(ext) for ext in image_extensions):
-                    full_path = os.path.join(temp_dir, file)
-                    if os.path.exists(full_path):
-                        image_files.append(full_path)
+            # scandir 复用目录项中的文件类型信息，无需逐个 stat
+            with os.scandir(temp_dir) as it:
+                entries = [entry for entry in it
+                           if entry.is_file(follow_symlinks=False)
+                           and entry.name.lower().endswith(TEMP_IMAGE_EXTENSIONS)]
             
-            # 按文件名排序
-            image_files.sort()
-            return image_files
+            # 与临时文件列表使用相同的排序，粘贴顺序与列表显示一致
+            entries.sort(key=_temp_file_sort_key)
+            return [entry.path for entry in entries]
             
         except Exception as e:
-            print(f"❌ 获取图片文件失败: {e}")
+            log.error("❌ 获取图片文件失败: %s", e)
             return []
     
     def start_auto_copy_paste(self):
         """开始自动遍历复制粘贴 (后台运行)"""
         if self.is_auto_processing:
-            print("⚠️ 自动遍历正在进行中，请等待完成")
+            log.warning("⚠️ 自动遍历正在进行中，请等待完成")
             return
         
         # 获取所有图片文件
-        self.images_to_process = self.get_temp_image_files()
+        images = self.get_temp_image_files()
         
-        if not self.images_to_process:
-            print("⚠️ 临时目录中没有找到图片文件")
+        if images:
+            self.total_images = len(images)
+            self._image_iter = iter(images)
+        elif self.pages_getter and self.pdf_path_getter and self.page_renderer:
+            # 没有临时图片时，直接在内存中渲染选中页面，无需写入磁盘
+            pages = list(self.pages_getter())
+            pdf_path = self.pdf_path_getter()
+            self.total_images = len(pages) if pdf_path else 0
+            if self.total_images:
+                self._image_iter = self._start_render_pipeline(pdf_path, pages)
+        else:
+            self.total_images = 0
+        
+        if not self.total_images:
+            log.warning("⚠️ 临时目录中没有找到图片文件")
             return
         
-        # 开始处理
-        self.current_image_index = 0
+        # 开始处理，逐个从迭代器取出，不再按下标访问列表
+        self.processed_count = 0
         self.is_auto_processing = True
         
         # 立即处理第一张图片
         self.process_next_image()
         
-        print(f"🚀 开始后台自动遍历 {len(self.images_to_process)} 张图片")
+        log.info("🚀 开始后台自动遍历 %s 张图片", self.total_images)
     
     def process_next_image(self):
         """处理下一张图片"""
-        if not self.is_auto_processing or self.current_image_index >= len(self.images_to_process):
+        if not self.is_auto_processing:
+            return
+        
+        current_image = next(self._image_iter, None)
+        if current_image is None:
             self.stop_auto_copy_paste()
             return
         
-        current_image = self.images_to_process[self.current_image_index]
+        # 页面仍在后台渲染，稍后重试，不阻塞界面线程
+        if current_image is self._NOT_READY:
+            self.auto_copy_timer.start(self.RENDER_RETRY_MS)
+            return
         
-        print(f"\n🖼️  处理第 {self.current_image_index + 1}/{len(self.images_to_process)} 张图片")
+        log.debug("🖼️  处理第 %s/%s 张图片", self.processed_count + 1, self.total_images)
         
         # 复制到剪贴板
-        if ClipboardService.copy_image_to_clipboard(current_image):
+        if self.copy_to_clipboard(current_image):
             # 等待一小段时间确保复制完成
             QTimer.singleShot(500, ClipboardService.simulate_paste)
         else:
-            print(f"❌ 复制失败，跳过: {os.path.basename(current_image)}")
+            log.error("❌ 复制失败，跳过: %s", self.describe_item(current_image))
         
         # 准备下一张图片
-        self.current_image_index += 1
+        self.processed_count += 1
         
         # 如果还有图片，设置定时器处理下一张
-        if self.current_image_index < len(self.images_to_process):
+        if self.processed_count < self.total_images:
             # 获取用户设置的时间间隔
             interval = self.get_copy_interval()
             self.auto_copy_timer.start(int(interval * 1000))  # 转换为毫秒并转为整数
@@ -98,6 +137,85 @@ class AutoCopyService:
             # 所有图片处理完成
             QTimer.singleShot(1000, self.stop_auto_copy_paste)
     
+    def _start_render_pipeline(self, pdf_path, pages):
+        """启动后台渲染线程，返回按顺序产出 (页码, 像素图) 的迭代器"""
+        # 队列和停止标记每次运行单独创建，上一次未退出的线程不会影响本次运行
+        self._render_stop = threading.Event()
+        self._render_queue = queue.Queue(maxsize=4)
+        self._render_thread = threading.Thread(
+            target=self._render_pages,
+            args=(pdf_path, pages, self._render_queue, self._render_stop), daemon=True)
+        self._render_thread.start()
+        return self._iter_rendered_pages(self._render_queue)
+    
+    def _render_pages(self, pdf_path, pages, render_queue, stop_event):
+        """生产者：依次渲染页面并放入队列，结束时放入 None 作为结束标记
+        
+        按开始时的PDF路径渲染，运行期间打开其他PDF不影响本次粘贴的内容
+        """
+        try:
+            for page_num in pages:
+                if stop_event.is_set():
+                    return
+                try:
+                    pix = self.page_renderer(pdf_path, page_num)
+                except Exception as e:
+                    log.error("❌ 渲染页面失败: %s", e)
+                    pix = None
+                if not self._put_rendered(render_queue, (page_num, pix), stop_event):
+                    return
+        finally:
+            self._put_rendered(render_queue, None, stop_event)
+    
+    @staticmethod
+    def _put_rendered(render_queue, item, stop_event):
+        """放入队列，队列满时等待，停止时放弃"""
+        while not stop_event.is_set():
+            try:
+                render_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    @classmethod
+    def _iter_rendered_pages(cls, render_queue):
+        """消费者：从队列中取出渲染结果，尚未渲染完成时产出 _NOT_READY，遇到结束标记时停止"""
+        while True:
+            try:
+                item = render_queue.get_nowait()
+            except queue.Empty:
+                yield cls._NOT_READY
+                continue
+            if item is None:
+                return
+            yield item
+    
+    def _stop_render_pipeline(self):
+        """通知后台渲染线程停止并释放队列 (线程在当前页渲染完成后自行退出，不在界面线程等待)"""
+        if self._render_thread is None:
+            return
+        self._render_stop.set()
+        self._render_thread = None
+        self._render_queue = None
+        self._render_stop = None
+    
+    def copy_to_clipboard(self, item):
+        """复制单个项目到剪贴板：图片路径或 (页码, 像素图)"""
+        if isinstance(item, tuple):
+            page_num, pix = item
+            if pix is None:
+                return False
+            return ClipboardService.copy_pixmap_to_clipboard(pix)
+        return ClipboardService.copy_image_to_clipboard(item)
+    
+    @staticmethod
+    def describe_item(item):
+        """获取项目的显示名称"""
+        if isinstance(item, tuple):
+            return f"第 {item[0] + 1} 页"
+        return os.path.basename(item)
+    
     def get_copy_interval(self):
         """获取复制间隔时间"""
         try:
@@ -106,15 +224,15 @@ class AutoCopyService:
             # 限制范围：最小0.5秒，最大60秒
             if interval < 0.5:
                 interval = 0.5
-                print("⚠️ 时间间隔不能小于0.5秒，已自动调整")
+                log.warning("⚠️ 时间间隔不能小于0.5秒，已自动调整")
             elif interval > 60:
                 interval = 60
-                print("⚠️ 时间间隔不能大于60秒，已自动调整")
+                log.warning("⚠️ 时间间隔不能大于60秒，已自动调整")
             
             return interval
             
         except (ValueError, TypeError):
-            print("⚠️ 时间间隔格式错误，使用默认值4秒")
+            log.warning("⚠️ 时间间隔格式错误，使用默认值4秒")
             return 4
     
     def stop_auto_copy_paste(self):
@@ -125,10 +243,14 @@ class AutoCopyService:
         self.auto_copy_timer.stop()
         self.is_auto_processing = False
         
-        if self.current_image_index >= len(self.images_to_process):
-            print(f"✅ 自动遍历完成！已处理 {len(self.images_to_process)} 张图片")
+        if self.processed_count >= self.total_images:
+            log.info("✅ 自动遍历完成！已处理 %s 张图片", self.processed_count)
         else:
-            print(f"🛑 自动遍历已停止 (处理了 {self.current_image_index}/{len(self.images_to_process)} 张)")
+            log.info("🛑 自动遍历已停止 (处理了 %s/%s 张)", self.processed_count, self.total_images)
+        
+        # 释放剩余的待处理项
+        self._stop_render_pipeline()
+        self._image_iter = iter(())
             
     def is_processing(self):
         """检查是否正在处理"""
@@ -5,21 +5,41 @@
 """
 
 import os
-import subprocess
+import logging
+
+log = logging.getLogger(__name__)
 
 # AppKit导入
 try:
-    from AppKit import NSPasteboard, NSPasteboardTypePNG, NSPasteboardTypeTIFF, NSImage
-    from Foundation import NSData
+    from AppKit import (NSPasteboard, NSPasteboardTypePNG, NSPasteboardTypeTIFF, NSImage,
+                        NSBitmapImageRep, NSDeviceRGBColorSpace)
+    from Foundation import NSData, NSDataReadingMappedAlways
     APPKIT_AVAILABLE = True
 except ImportError:
-    print("⚠️ AppKit不可用，将使用替代方法")
+    log.warning("⚠️ AppKit不可用，将使用替代方法")
     APPKIT_AVAILABLE = False
 
+# Quartz导入 (模拟按键)
+try:
+    import Quartz
+    QUARTZ_AVAILABLE = True
+except ImportError:
+    log.warning("⚠️ Quartz不可用，无法模拟粘贴")
+    QUARTZ_AVAILABLE = False
+
+# 虚拟键码 kVK_ANSI_V
+KEY_CODE_V = 9
+
 
 class ClipboardService:
     """剪贴板服务类"""
     
+    # 写入剪贴板的图片格式: "tiff" 或 "png"，只编码一种格式以减少CPU开销
+    PREFERRED_FORMAT = "tiff"
+    
+    # 使用TIFF格式时是否同时提供PNG格式 (部分应用只识别PNG时开启)
+    ALWAYS_OFFER_PNG = False
+    
     @staticmethod
     def copy_image_to_clipboard(image_path):
         """
@@ -34,83 +54,169 @@ class ClipboardService:
         try:
             # 检查文件是否存在
             if not os.path.exists(image_path):
-                print(f"❌ 错误: 文件不存在 - {image_path}")
+                log.error("❌ 错误: 文件不存在 - %s", image_path)
                 return False
             
             if not APPKIT_AVAILABLE:
-                print("❌ AppKit不可用，无法复制到剪贴板")
+                log.error("❌ AppKit不可用，无法复制到剪贴板")
                 return False
             
             # 获取绝对路径
             abs_path = os.path.abspath(image_path)
-            print(f"📁 复制图片: {os.path.basename(abs_path)}")
+            log.debug("📁 复制图片: %s", os.path.basename(abs_path))
             
             # 获取剪贴板
             pb = NSPasteboard.generalPasteboard()
             pb.clearContents()
             
+            # 以内存映射方式读取文件，避免逐块read()拷贝到Foundation缓冲区
+            data, error = NSData.dataWithContentsOfFile_options_error_(
+                abs_path, NSDataReadingMappedAlways, None)
+            if data is None:
+                log.error("❌ 错误: 无法读取图片文件 - %s", error)
+                return False
+            
             # 创建NSImage对象
-            img = NSImage.alloc().initWithContentsOfFile_(abs_path)
+            img = NSImage.alloc().initWithData_(data)
             
             if img is None:
-                print(f"❌ 错误: 无法加载图片文件")
+                log.error("❌ 错误: 无法加载图片文件")
+                return False
+            
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📊 图片尺寸: %s x %s", img.size().width, img.size().height)
+            
+            if not ClipboardService._write_image_data(pb, img):
+                return False
+            
+            log.debug("✅ 图片已复制到剪贴板: %s", os.path.basename(image_path))
+            return True
+            
+        except Exception as e:
+            log.error("❌ 复制图片异常: %s", e)
+            return False
+    
+    @staticmethod
+    def _write_image_data(pb, image):
+        """
+        按 PREFERRED_FORMAT 将图片数据写入剪贴板
+        
+        参数:
+            pb: NSPasteboard 对象
+            image: NSImage 或 NSBitmapImageRep 对象
+        
+        返回:
+            bool: 操作是否成功
+        """
+        if ClipboardService.PREFERRED_FORMAT == "png":
+            return ClipboardService._write_png_data(pb, image)
+        
+        # 设置TIFF格式(NSImage的标准格式)
+        tiff_data = image.TIFFRepresentation()
+        if not tiff_data:
+            log.error("❌ 错误: TIFF格式转换失败")
+            return False
+        pb.setData_forType_(tiff_data, NSPasteboardTypeTIFF)
+        log.debug("✅ 成功设置TIFF格式")
+        
+        # TIFF已设置成功时，仅在明确要求时额外提供PNG，避免多余的PNG编码
+        if ClipboardService.ALWAYS_OFFER_PNG:
+            if not ClipboardService._write_png_data(pb, image):
+                log.warning("⚠️ PNG格式设置失败")
+        
+        return True
+    
+    @staticmethod
+    def _write_png_data(pb, image):
+        """将图片编码为PNG并写入剪贴板"""
+        if isinstance(image, NSBitmapImageRep):
+            bitmap_rep = image
+        else:
+            bitmap_rep = image.representations()[0]
+        png_data = bitmap_rep.representationUsingType_properties_(
+            4,  # NSBitmapImageFileTypePNG
+            None
+        ) if bitmap_rep else None
+        if not png_data:
+            log.error("❌ 错误: PNG格式转换失败")
+            return False
+        pb.setData_forType_(png_data, NSPasteboardTypePNG)
+        log.debug("✅ 成功设置PNG格式")
+        return True
+    
+    @staticmethod
+    def copy_pixmap_to_clipboard(pix):
+        """
+        将 PyMuPDF 渲染的像素数据直接复制到剪贴板，无需经过磁盘图片文件
+        
+        参数:
+            pix (fitz.Pixmap): RGB/RGBA 像素图
+        
+        返回:
+            bool: 操作是否成功
+        """
+        try:
+            if not APPKIT_AVAILABLE:
+                log.error("❌ AppKit不可用，无法复制到剪贴板")
                 return False
             
-            print(f"📊 图片尺寸: {img.size().width} x {img.size().height}")
-            
-            # 方法1: 设置TIFF格式(NSImage的标准格式)
-            tiff_data = img.TIFFRepresentation()
-            if tiff_data:
-                pb.setData_forType_(tiff_data, NSPasteboardTypeTIFF)
-                print("✅ 成功设置TIFF格式")
-            
-            # 方法2: 尝试设置PNG格式
-            try:
-                # 获取图像的bitmap representation
-                bitmap_rep = img.representations()[0]
-                if bitmap_rep:
-                    # 转换为PNG格式
-                    png_data = bitmap_rep.representationUsingType_properties_(
-                        4,  # NSBitmapImageFileTypePNG
-                        None
-                    )
-                    if png_data:
-                        pb.setData_forType_(png_data, NSPasteboardTypePNG)
-                        print("✅ 成功设置PNG格式")
-            except Exception as e:
-                print(f"⚠️ PNG格式设置失败: {e}")
-            
-            print(f"✅ 图片已复制到剪贴板: {os.path.basename(image_path)}")
+            # 由原始像素数据直接构建位图，跳过PNG编码/解码及磁盘读写
+            samples = bytes(pix.samples_mv)
+            bitmap_rep = NSBitmapImageRep.alloc().initWithBitmapDataPlanes_pixelsWide_pixelsHigh_bitsPerSample_samplesPerPixel_hasAlpha_isPlanar_colorSpaceName_bytesPerRow_bitsPerPixel_(
+                (samples, None, None, None, None),
+                pix.width,
+                pix.height,
+                8,
+                pix.n,
+                bool(pix.alpha),
+                False,
+                NSDeviceRGBColorSpace,
+                pix.stride,
+                8 * pix.n
+            )
+            
+            if bitmap_rep is None:
+                log.error("❌ 错误: 无法创建位图")
+                return False
+            
+            log.debug("📊 图片尺寸: %s x %s", pix.width, pix.height)
+            
+            # 获取剪贴板
+            pb = NSPasteboard.generalPasteboard()
+            pb.clearContents()
+            
+            if not ClipboardService._write_image_data(pb, bitmap_rep):
+                return False
+            
+            log.debug("✅ 页面图像已复制到剪贴板")
             return True
             
         except Exception as e:
-            print(f"❌ 复制图片异常: {e}")
+            log.error("❌ 复制页面图像异常: %s", e)
             return False
     
     @staticmethod
     def simulate_paste():
         """模拟执行 Cmd+V 粘贴操作"""
         try:
-            # 使用 osascript 模拟按键
-            script = '''
-            tell application "System Events"
-                keystroke "v" using command down
-            end tell
-            '''
-            
-            result = subprocess.run(['osascript', '-e', script], 
-                                  capture_output=True, text=True, timeout=5)
-            
-            if result.returncode == 0:
-                print("📋 已执行粘贴操作 (Cmd+V)")
-                return True
-            else:
-                print(f"❌ 粘贴操作失败: {result.stderr}")
+            if not QUARTZ_AVAILABLE:
+                log.error("❌ Quartz不可用，无法模拟粘贴")
                 return False
-                
-        except subprocess.TimeoutExpired:
-            print("❌ 粘贴操作超时")
-            return False
+            
+            # 直接发送键盘事件，无需启动 osascript 子进程
+            src = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+            
+            key_down = Quartz.CGEventCreateKeyboardEvent(src, KEY_CODE_V, True)
+            Quartz.CGEventSetFlags(key_down, Quartz.kCGEventFlagMaskCommand)
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, key_down)
+            
+            key_up = Quartz.CGEventCreateKeyboardEvent(src, KEY_CODE_V, False)
+            Quartz.CGEventSetFlags(key_up, Quartz.kCGEventFlagMaskCommand)
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, key_up)
+            
+            log.debug("📋 已执行粘贴操作 (Cmd+V)")
+            return True
+            
         except Exception as e:
-            print(f"❌ 粘贴操作异常: {e}")
-            return False 
\ No newline at end of file
+            log.error("❌ 粘贴操作异常: %s", e)
+            return False
\ No newline at end of file
@@ -4,11 +4,12 @@
 处理全局快捷键监听
 """
 
-import time
-import threading
+import logging
 import Cocoa
 import Quartz
 
+log = logging.getLogger(__name__)
+
 
 class KeyboardService:
     """键盘监听服务类"""
@@ -16,47 +17,81 @@ class KeyboardService:
     def __init__(self, callback=None):
         self.callback = callback
         self.is_running = False
-        self.thread = None
-        
-    def get_key_state(self):
-        """获取当前按键状态"""
-        # 获取当前按键状态
-        keys = Quartz.CGEventSourceFlagsState(Quartz.kCGEventSourceStateCombinedSessionState)
+        self._last_state = False  # 上一次组合键是否处于按下状态
         
+        # 事件监听相关
+        self._tap = None
+        self._source = None
+        self._run_loop = None
+    
+    def check_flags(self, flags):
+        """根据修饰键状态检测快捷键"""
         # 检测 Command 键
-        cmd_pressed = keys & Quartz.kCGEventFlagMaskCommand
+        cmd_pressed = flags & Quartz.kCGEventFlagMaskCommand
         
         # 检测 Option 键
-        option_pressed = keys & Quartz.kCGEventFlagMaskAlternate
+        option_pressed = flags & Quartz.kCGEventFlagMaskAlternate
+        
+        # 检测 Option 键 同时 Command 键 同时按下，仅在按下瞬间触发一次
+        combo_pressed = bool(option_pressed and cmd_pressed)
+        triggered = combo_pressed and not self._last_state
+        self._last_state = combo_pressed
         
-        # 检测 Option 键 同时 Command 键 同时按下
-        if option_pressed and cmd_pressed:
-            print("🎯 Option + Command 组合键触发!")
+        if triggered:
             if self.callback:
                 self.callback()
-            return True
         
-        return False
+        return triggered
     
     def start_listening(self):
         """启动键盘监听"""
         if self.is_running:
             return
-            
-        self.is_running = True
-        self.thread = threading.Thread(target=self._listen_loop, daemon=True)
-        self.thread.start()
-        print("🎧 开始全局监听 Option+Command 快捷键...")
         
+        self._tap = Quartz.CGEventTapCreate(
+            Quartz.kCGHIDEventTap,
+            Quartz.kCGHeadInsertEventTap,
+            Quartz.kCGEventTapOptionListenOnly,
+            Quartz.CGEventMaskBit(Quartz.kCGEventFlagsChanged),
+            self._event_callback,
+            None
+        )
+        
+        if self._tap is None:
+            log.error("❌ 无法创建键盘事件监听，请检查辅助功能权限")
+            return
+        
+        # 挂载到主线程RunLoop (即Qt事件循环)，回调直接在主线程执行，无需额外线程
+        self._source = Quartz.CFMachPortCreateRunLoopSource(None, self._tap, 0)
+        self._run_loop = Quartz.CFRunLoopGetMain()
+        Quartz.CFRunLoopAddSource(self._run_loop, self._source, Quartz.kCFRunLoopCommonModes)
+        Quartz.CGEventTapEnable(self._tap, True)
+        
+        self.is_running = True
+        log.info("🎧 开始全局监听 Option+Command 快捷键...")
+    
     def stop_listening(self):
         """停止键盘监听"""
+        if not self.is_running:
+            return
+        
         self.is_running = False
-        if self.thread:
-            self.thread.join(timeout=1)
-        print("🛑 键盘监听已停止")
-        
-    def _listen_loop(self):
-        """监听循环"""
-        while self.is_running:
-            self.get_key_state()
-            time.sleep(0.1)  # 每0.1秒检查一次 
\ No newline at end of file
+        Quartz.CGEventTapEnable(self._tap, False)
+        Quartz.CFRunLoopRemoveSource(self._run_loop, self._source, Quartz.kCFRunLoopCommonModes)
+        Quartz.CFMachPortInvalidate(self._tap)
+        self._tap = None
+        self._source = None
+        self._run_loop = None
+        log.info("🛑 键盘监听已停止")
+    
+    def _event_callback(self, proxy, event_type, event, refcon):
+        """修饰键变化事件回调"""
+        # 回调超时或被用户输入禁用时，系统会关闭监听，需要重新启用
+        if event_type in (Quartz.kCGEventTapDisabledByTimeout,
+                          Quartz.kCGEventTapDisabledByUserInput):
+            if self._tap is not None:
+                Quartz.CGEventTapEnable(self._tap, True)
+            return event
+        
+        self.check_flags(Quartz.CGEventGetFlags(event))
+        return event
\ No newline at end of file
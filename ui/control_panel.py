@@ -4,10 +4,13 @@
 """
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QLabel, QLineEdit, QTextEdit, QListWidget, 
-                            QListWidgetItem, QGroupBox, QProgressBar, QMenu, QAction)
-from PyQt5.QtCore import Qt, pyqtSignal
-import os
+                            QLabel, QLineEdit, QPlainTextEdit, QListView, 
+                            QAbstractItemView, QGroupBox, QProgressBar, QMenu, QAction)
+from PyQt5.QtCore import Qt, pyqtSignal, QThreadPool
+from functools import partial
+
+from models.temp_files_model import TempFilesModel, TempFileProbeTask
+from .temp_file_delegate import TempFileDelegate
 
 
 class ControlPanel(QWidget):
@@ -26,6 +29,10 @@ class ControlPanel(QWidget):
     def __init__(self):
         super().__init__()
         self.setMaximumWidth(400)
+        self._probe_generation = 0  # 最新一次文件检测的编号，用于丢弃过期结果
+        self._last_page_list_str = ""  # 上次显示的选中页码文本
+        self._cached_interval = None  # 已解析的复制间隔
+        self._last_pct = -1  # 进度条当前显示的百分比
         self.init_ui()
         
     def init_ui(self):
@@ -46,6 +53,7 @@ class ControlPanel(QWidget):
         
         # 进度条
         self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)  # 以百分比显示进度
         self.progress_bar.setVisible(False)
         file_layout.addWidget(self.progress_bar)
         
@@ -79,9 +87,12 @@ class ControlPanel(QWidget):
         self.selected_label = QLabel("已选择: 0 页")
         selection_layout.addWidget(self.selected_label)
         
-        self.selected_list = QTextEdit()
+        # 纯文本显示页码列表，无需富文本解析与布局
+        self.selected_list = QPlainTextEdit()
         self.selected_list.setMaximumHeight(100)
         self.selected_list.setReadOnly(True)
+        self.selected_list.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.selected_list.setMaximumBlockCount(1)
         selection_layout.addWidget(self.selected_list)
         
         layout.addWidget(selection_group)
@@ -98,6 +109,7 @@ class ControlPanel(QWidget):
         self.interval_input.setText("4")  # 默认4秒
         self.interval_input.setFixedWidth(60)
         self.interval_input.setPlaceholderText("4.0")
+        self.interval_input.textChanged.connect(self._invalidate_interval_cache)
         interval_layout.addWidget(self.interval_input)
         
         interval_layout.addWidget(QLabel("秒"))
@@ -110,7 +122,7 @@ class ControlPanel(QWidget):
             btn = QPushButton(text)
             btn.setFixedSize(30, 25)
             btn.setStyleSheet("font-size: 10px; padding: 2px;")
-            btn.clicked.connect(lambda checked, t=time_val: self.set_interval(t))
+            btn.clicked.connect(partial(self.set_interval, time_val))
             quick_interval_layout.addWidget(btn)
         
         interval_layout.addLayout(quick_interval_layout)
@@ -123,10 +135,17 @@ class ControlPanel(QWidget):
         self.save_images_button.setEnabled(False)
         temp_layout.addWidget(self.save_images_button)
         
-        # 临时文件列表
-        self.temp_files_list = QListWidget()
+        # 临时文件列表 (模型按需提供数据，不为每个文件创建列表项)
+        self.temp_files_model = TempFilesModel(self)
+        self.temp_files_list = QListView()
+        self.temp_files_list.setModel(self.temp_files_model)
+        self.temp_files_list.setItemDelegate(TempFileDelegate(self.temp_files_list))
         self.temp_files_list.setMaximumHeight(100)
-        self.temp_files_list.setSelectionMode(QListWidget.ExtendedSelection)  # 支持多选
+        # 每行都是单行文件名，高度一致，无需逐行计算尺寸；大量文件时分批布局
+        self.temp_files_list.setUniformItemSizes(True)
+        self.temp_files_list.setLayoutMode(QListView.Batched)
+        self.temp_files_list.setBatchSize(100)
+        self.temp_files_list.setSelectionMode(QAbstractItemView.ExtendedSelection)  # 支持多选
         self.temp_files_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.temp_files_list.customContextMenuRequested.connect(self.show_context_menu)
         temp_layout.addWidget(self.temp_files_list)
@@ -166,7 +185,7 @@ class ControlPanel(QWidget):
     
     def show_context_menu(self, position):
         """显示右键菜单"""
-        if self.temp_files_list.itemAt(position) is None:
+        if not self.temp_files_list.indexAt(position).isValid():
             return
             
         context_menu = QMenu(self)
@@ -185,14 +204,14 @@ class ControlPanel(QWidget):
     
     def delete_selected_files(self):
         """删除选中的文件"""
-        selected_items = self.temp_files_list.selectedItems()
-        if not selected_items:
+        selected_rows = self.temp_files_list.selectionModel().selectedRows()
+        if not selected_rows:
             return
             
         # 获取选中文件的路径
         selected_files = []
-        for item in selected_items:
-            file_path = item.data(Qt.UserRole)
+        for index in selected_rows:
+            file_path = self.temp_files_model.data(index, Qt.UserRole)
             if file_path:
                 selected_files.append(file_path)
         
@@ -200,20 +219,30 @@ class ControlPanel(QWidget):
             self.delete_selected_files_requested.emit(selected_files)
         
     def get_copy_interval(self):
-        """获取复制间隔时间"""
+        """获取复制间隔时间 (输入变化前复用上次解析结果)"""
+        if self._cached_interval is not None:
+            return self._cached_interval
+        
         try:
             interval_text = self.interval_input.text().strip()
             if not interval_text:
-                return 4
-            interval = float(interval_text)
-            # 限制范围在0.5-60秒之间
-            if interval < 0.5:
-                interval = 0.5
-            elif interval > 60:
-                interval = 60
-            return interval
+                interval = 4
+            else:
+                interval = float(interval_text)
+                # 限制范围在0.5-60秒之间
+                if interval < 0.5:
+                    interval = 0.5
+                elif interval > 60:
+                    interval = 60
         except ValueError:
-            return 4
+            interval = 4
+        
+        self._cached_interval = interval
+        return interval
+        
+    def _invalidate_interval_cache(self):
+        """间隔输入变化时清除缓存"""
+        self._cached_interval = None
             
     def set_interval(self, interval):
         """设置复制间隔时间"""
@@ -228,11 +257,15 @@ class ControlPanel(QWidget):
         self.progress_bar.setVisible(show)
         if show:
             self.progress_bar.setValue(0)
+            self._last_pct = 0
             
     def update_progress(self, current, total):
-        """更新进度"""
-        self.progress_bar.setMaximum(total)
-        self.progress_bar.setValue(current)
+        """更新进度 (按百分比显示，百分比不变时不触发重绘)"""
+        pct = current * 100 // total if total > 0 else 0
+        if pct == self._last_pct:
+            return
+        self._last_pct = pct
+        self.progress_bar.setValue(pct)
         
     def enable_select_button(self, enabled):
         """启用/禁用选择按钮"""
@@ -249,26 +282,45 @@ class ControlPanel(QWidget):
     def update_selection_info(self, count, page_list):
         """更新选择信息"""
         self.selected_label.setText(f"已选择: {count} 页")
-        self.selected_list.setText(page_list)
         self.save_images_button.setEnabled(count > 0)
         
-    def update_temp_files(self, temp_files):
-        """更新临时文件列表"""
-        self.temp_files_list.clear()
+        # 内容未变化时跳过重新布局
+        if page_list == self._last_page_list_str:
+            return
+        self._last_page_list_str = page_list
+        self.selected_list.setPlainText(page_list)
+        
+    def update_temp_files(self, temp_files, exists=None):
+        """
+        更新临时文件列表
+        
+        参数:
+            temp_files (list): 临时文件路径列表
+            exists (list): 调用方已通过扫描目录得知的存在状态，提供时不再检测
+        """
+        # 只更新变化的行；新增的行先按存在显示，文件检测在线程池中进行，完成后再更新状态
+        # 更新期间暂停重绘，结束后只绘制一次
+        self.temp_files_list.setUpdatesEnabled(False)
+        try:
+            self.temp_files_model.apply_update(temp_files)
+        finally:
+            self.temp_files_list.setUpdatesEnabled(True)
+        
+        self._probe_generation += 1
+        if exists is not None:
+            self.temp_files_model.update_exists(exists)
+        elif temp_files:
+            task = TempFileProbeTask(self._probe_generation, temp_files)
+            task.signals.probed.connect(self._apply_probe_result)
+            QThreadPool.globalInstance().start(task)
         
         if temp_files:
-            for file_path in temp_files:
-                file_name = os.path.basename(file_path)
-                item = QListWidgetItem(file_name)
-                item.setData(Qt.UserRole, file_path)
-                
-                # 检查文件是否存在
-                if not os.path.exists(file_path):
-                    item.setText(f"❌ {file_name} (已删除)")
-                    item.setEnabled(False)
-                
-                self.temp_files_list.addItem(item)
-            
             self.temp_files_label.setText(f"临时文件: {len(temp_files)} 个")
         else:
-            self.temp_files_label.setText("临时文件: 0 个") 
\ No newline at end of file
+            self.temp_files_label.setText("临时文件: 0 个")
+            
+    def _apply_probe_result(self, generation, exists):
+        """应用文件存在性检测结果"""
+        if generation != self._probe_generation:
+            return
+        self.temp_files_model.update_exists(exists)
\ No newline at end of file
@@ -5,15 +5,16 @@
 
 import sys
 import os
+import bisect
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, 
                             QWidget, QSplitter, QMessageBox, QFileDialog)
-from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QFont, QKeySequence
+from PyQt5.QtCore import Qt, QThreadPool, QUrl, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QFont, QKeySequence, QDesktopServices
 from PyQt5.QtWidgets import QShortcut
 
 from .control_panel import ControlPanel
 from .pdf_display import PDFDisplay
-from models.pdf_model import PDFDocument, PDFLoader
+from models.pdf_model import PDFDocument, PDFLoader, PageExportTask, render_page_from_path
 from services.keyboard_service import KeyboardService
 from services.auto_copy_service import AutoCopyService
 
@@ -35,12 +36,24 @@ class MainWindow(QMainWindow):
         self.keyboard_service = KeyboardService(callback=self.on_global_shortcut)
         self.auto_copy_service = AutoCopyService(
             temp_dir_getter=lambda: self.pdf_document.temp_dir,
-            interval_getter=self.get_copy_interval
+            interval_getter=self.get_copy_interval,
+            pages_getter=lambda: sorted(self.pdf_document.selected_pages),
+            pdf_path_getter=lambda: self.pdf_document.pdf_path,
+            page_renderer=render_page_from_path
         )
         
         # PDF加载器
         self.pdf_loader = None
         
+        # 后台导出状态
+        self._export_total = 0
+        self._export_pending = 0
+        self._export_results = []
+        self._export_temp_dir = None  # 导出开始时文档的临时目录
+        
+        # 上次显示的已排序页码
+        self._last_selection = None
+        
         self.init_ui()
         self.setup_shortcuts()
         self.setup_connections()
@@ -53,48 +66,6 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("PDF页面选择器")
         self.setGeometry(100, 100, 1400, 800)
         
-        # 设置主题样式
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            QPushButton {
-                background-color: #007AFF;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0056CC;
-            }
-            QPushButton:pressed {
-                background-color: #004499;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #cccccc;
-                border-radius: 5px;
-                margin-top: 1ex;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #ddd;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            QLabel {
-                color: #333;
-            }
-        """)
-        
         # 创建中央widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -142,14 +113,21 @@ class MainWindow(QMainWindow):
         # PDF显示区域信号连接
         self.pdf_display.page_selection_changed.connect(self.on_page_selection_changed)
         
-        # 全局快捷键信号连接
-        self.command_r_signal.connect(self.auto_copy_service.start_auto_copy_paste)
+        # 全局快捷键信号连接 (排队执行，让事件监听回调立即返回)
+        self.command_r_signal.connect(self.on_auto_copy_requested, Qt.QueuedConnection)
         
     def on_global_shortcut(self):
         """全局快捷键回调"""
         # 使用Qt的信号槽机制在主线程中执行
         self.command_r_signal.emit()
         
+    @pyqtSlot()
+    def on_auto_copy_requested(self):
+        """开始自动遍历，正在处理时忽略重复触发"""
+        if self.auto_copy_service.is_processing():
+            return
+        self.auto_copy_service.start_auto_copy_paste()
+        
     def get_copy_interval(self):
         """获取复制间隔时间"""
         return self.control_panel.get_copy_interval()
@@ -162,6 +140,10 @@ class MainWindow(QMainWindow):
         if file_path:
             self.pdf_document.load_document(file_path)
             self.control_panel.set_file_info(os.path.basename(file_path))
+            
+            # 临时目录已切换到该文档的子目录，列表显示新目录中的文件
+            temp_files = self.pdf_document.temp_files
+            self.control_panel.update_temp_files(temp_files, exists=[True] * len(temp_files))
             self.load_pdf()
             
     def load_pdf(self):
@@ -179,9 +161,15 @@ class MainWindow(QMainWindow):
         # 显示进度条
         self.control_panel.show_progress(True)
         
-        # 启动加载线程
-        self.pdf_loader = PDFLoader(self.pdf_document.pdf_path)
-        self.pdf_loader.page_loaded.connect(self.pdf_display.add_page)
+        # 启动加载线程 (重新打开同一PDF时从磁盘缓存读取缩略图)
+        target_width, doc_key, cache_zoom = self.pdf_display.get_load_settings()
+        self.pdf_loader = PDFLoader(self.pdf_document.pdf_path,
+                                    target_width=target_width,
+                                    doc=self.pdf_document.doc,
+                                    doc_lock=self.pdf_document.doc_lock,
+                                    doc_key=doc_key,
+                                    cache_zoom=cache_zoom)
+        self.pdf_loader.pages_loaded.connect(self.pdf_display.add_pages)
         self.pdf_loader.loading_finished.connect(self.on_loading_finished)
         self.pdf_loader.loading_progress.connect(self.control_panel.update_progress)
         self.pdf_loader.start()
@@ -210,14 +198,16 @@ class MainWindow(QMainWindow):
             pages = self.pdf_document.parse_page_range(page_range)
             total_pages = self.pdf_document.get_page_count()
             
-            # 验证页码
-            valid_pages = []
-            for page in pages:
-                if 1 <= page <= total_pages:
-                    valid_pages.append(page - 1)  # 转换为0索引
+            # 验证页码 (页码已排序，只需检查首尾)
+            if pages and (pages[0] < 1 or pages[-1] > total_pages):
+                if pages[0] < 1:
+                    invalid_page = pages[0]
                 else:
-                    QMessageBox.warning(self, "警告", f"页码 {page} 超出范围 (1-{total_pages})")
-                    return
+                    invalid_page = pages[bisect.bisect_right(pages, total_pages)]
+                QMessageBox.warning(self, "警告", f"页码 {invalid_page} 超出范围 (1-{total_pages})")
+                return
+            
+            valid_pages = [page - 1 for page in pages]  # 转换为0索引
                     
             # 选择页面
             self.pdf_display.select_pages(valid_pages)
@@ -227,12 +217,17 @@ class MainWindow(QMainWindow):
             
     def on_page_selection_changed(self, selected_pages):
         """页面选择改变"""
+        # PDFDisplay 已将同一轮事件循环内的多次变化合并为一次通知，这里直接更新显示
         self.pdf_document.selected_pages = selected_pages
         
-        count = len(selected_pages)
-        page_numbers = [str(page + 1) for page in sorted(selected_pages)]
+        # 选择未变化时跳过排序结果的格式化
+        pages = sorted(selected_pages)
+        if pages == self._last_selection:
+            return
+        self._last_selection = pages
         
-        self.control_panel.update_selection_info(count, ", ".join(page_numbers))
+        page_list_str = ", ".join([str(page + 1) for page in pages])
+        self.control_panel.update_selection_info(len(pages), page_list_str)
         
     def clear_selection(self):
         """清除页面选择"""
@@ -253,34 +248,82 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "临时目录未创建")
             return
         
+        if self._export_pending:
+            QMessageBox.information(self, "提示", "正在保存页面，请稍候")
+            return
+        
         try:
-            saved_files = []
-            failed_count = 0
-            
+            self.pdf_document.begin_export()
+            tasks = []
             for page_num in sorted(self.pdf_document.selected_pages):
-                output_path = self.pdf_document.pdf_page_to_image(page_num, dpi=300)
-                if output_path:
-                    saved_files.append(output_path)
-                    self.pdf_document.temp_files.append(output_path)
-                else:
-                    failed_count += 1
+                output_path = self.pdf_document.get_export_path(page_num)
+                task = PageExportTask(self.pdf_document.pdf_path, page_num, 300, output_path)
+                task.signals.page_exported.connect(self.on_page_exported)
+                task.signals.page_failed.connect(self.on_page_export_failed)
+                tasks.append(task)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"保存过程中发生错误: {e}")
+            return
+        
+        self._export_total = len(tasks)
+        self._export_pending = len(tasks)
+        self._export_results = []
+        self._export_temp_dir = self.pdf_document.temp_dir
+        
+        self.control_panel.show_progress(True)
+        self.control_panel.update_progress(0, self._export_total)
+        
+        # 每个页面作为独立任务提交到线程池，界面线程不阻塞
+        thread_pool = QThreadPool.globalInstance()
+        for task in tasks:
+            thread_pool.start(task)
+    
+    @pyqtSlot(int, str)
+    def on_page_exported(self, page_num, output_path):
+        """单个页面导出完成"""
+        self._export_results.append((page_num, output_path))
+        self._on_export_progress()
+        
+    @pyqtSlot(int)
+    def on_page_export_failed(self, page_num):
+        """单个页面导出失败"""
+        self._on_export_progress()
+        
+    def _on_export_progress(self):
+        """更新导出进度，全部完成后显示结果"""
+        self._export_pending -= 1
+        self.control_panel.update_progress(self._export_total - self._export_pending,
+                                           self._export_total)
+        if self._export_pending > 0:
+            return
+        
+        self.control_panel.show_progress(False)
+        
+        saved_files = [path for _, path in sorted(self._export_results)]
+        self._export_results = []
+        export_dir = self._export_temp_dir
+        self._export_temp_dir = None
+        
+        # 导出期间切换了文档时，文件保留在原文档的临时目录中，不加入当前文档的列表
+        if export_dir == self.pdf_document.temp_dir:
+            # 按页码顺序加入临时文件列表 (切换回同一文档时可能已由目录扫描加入)
+            known_files = set(self.pdf_document.temp_files)
+            self.pdf_document.temp_files.extend(
+                path for path in saved_files if path not in known_files)
             
             # 更新临时文件列表显示
             self.control_panel.update_temp_files(self.pdf_document.temp_files)
-            
-            # 显示结果
-            success_count = len(saved_files)
-            total_count = len(self.pdf_document.selected_pages)
-            
-            if success_count > 0:
-                QMessageBox.information(self, "保存完成", 
-                                      f"成功保存 {success_count}/{total_count} 页为图片\n"
-                                      f"保存位置: {self.pdf_document.temp_dir}")
-            else:
-                QMessageBox.warning(self, "保存失败", "所有页面保存失败")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存过程中发生错误: {e}")
+        
+        # 显示结果
+        success_count = len(saved_files)
+        total_count = self._export_total
+        
+        if success_count > 0:
+            QMessageBox.information(self, "保存完成", 
+                                  f"成功保存 {success_count}/{total_count} 页为图片\n"
+                                  f"保存位置: {export_dir}")
+        else:
+            QMessageBox.warning(self, "保存失败", "所有页面保存失败")
     
     def refresh_temp_files(self):
         """刷新临时文件列表"""
@@ -291,8 +334,9 @@ class MainWindow(QMainWindow):
         # 重新扫描临时目录
         self.pdf_document.refresh_temp_files()
         
-        # 更新显示
-        self.control_panel.update_temp_files(self.pdf_document.temp_files)
+        # 更新显示 (列表刚由目录扫描得到，文件均存在，无需再次检测)
+        temp_files = self.pdf_document.temp_files
+        self.control_panel.update_temp_files(temp_files, exists=[True] * len(temp_files))
         
         QMessageBox.information(self, "刷新完成", 
                               f"已刷新临时文件列表，共 {len(self.pdf_document.temp_files)} 个文件")
@@ -345,12 +389,10 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "临时目录不存在")
             return
             
-        try:
-            # macOS 使用 open 命令打开文件夹
-            import subprocess
-            subprocess.run(["open", self.pdf_document.temp_dir])
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"无法打开文件夹: {e}")
+        # 交由系统异步打开文件夹，不等待 Finder 启动
+        url = QUrl.fromLocalFile(self.pdf_document.temp_dir)
+        if not QDesktopServices.openUrl(url):
+            QMessageBox.critical(self, "错误", "无法打开文件夹")
             
     def closeEvent(self, event):
         """程序关闭时清理资源"""
@@ -361,14 +403,18 @@ class MainWindow(QMainWindow):
         # 停止键盘监听
         self.keyboard_service.stop_listening()
         
-        # 询问是否删除临时文件
-        if self.pdf_document.temp_files:
+        # 询问是否删除临时文件 (退出时删除整个共享临时目录，按其中所有PDF的文件计数)
+        temp_count = self.pdf_document.count_all_temp_files()
+        if temp_count:
             reply = QMessageBox.question(self, "退出程序", 
-                                       f"程序即将退出，是否删除 {len(self.pdf_document.temp_files)} 个临时文件？",
+                                       f"程序即将退出，是否删除 {temp_count} 个临时文件？",
                                        QMessageBox.Yes | QMessageBox.No,
                                        QMessageBox.Yes)
             
             if reply == QMessageBox.Yes:
                 self.pdf_document.cleanup()
+        else:
+            # 没有临时文件时直接删除空的临时目录
+            self.pdf_document.cleanup()
         
         event.accept() 
\ No newline at end of file
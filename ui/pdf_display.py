@@ -5,10 +5,11 @@ PDF显示区域UI组件
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QListWidget, QListWidgetItem)
-from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import QPixmap, QIcon
-from models.pdf_model import PDFPageItem
-import fitz
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QThreadPool, QTimer
+from PyQt5.QtGui import QPixmap, QIcon, QPixmapCache
+from models.pdf_model import PDFPageItem, PageRenderTask
+from models.thumbnail_cache import RENDER_BANDS, document_key, thumbnail_path, touch_document
+import os
 
 
 class PDFDisplay(QWidget):
@@ -17,6 +18,32 @@ class PDFDisplay(QWidget):
     # 信号定义
     page_selection_changed = pyqtSignal(list)  # 选中页面列表
     
+    # 已渲染页面内存缓存上限 (KB)，由Qt全局像素图缓存按占用内存淘汰
+    PIX_CACHE_LIMIT_KB = 256 * 1024
+    
+    # 可见区域前后额外预渲染的页数
+    PREFETCH_PAGES = 5
+    
+    # 线程池任务优先级：可见页面先于预渲染页面 (包括之前滚动时排队的任务)
+    VISIBLE_RENDER_PRIORITY = 1
+    PREFETCH_RENDER_PRIORITY = 0
+    
+    # 滚动停止后渲染新可见页面的延迟(毫秒)
+    SCROLL_RENDER_DELAY = 80
+    
+    # 缩放操作停止后重新渲染的延迟(毫秒)
+    ZOOM_RENDER_DELAY = 120
+    
+    # 图标宽度达到该值时缩放图片使用平滑变换
+    SMOOTH_SCALE_MIN_WIDTH = 200
+    
+    # 100% 缩放时的图标尺寸
+    BASE_ICON_WIDTH = 200
+    BASE_ICON_HEIGHT = 250
+    
+    # 渲染档位 (与磁盘缓存档位共用)，同一档位内的缩放只需缩放已有图片，跨档位时才重新渲染
+    ZOOM_BANDS = RENDER_BANDS
+    
     def __init__(self):
         super().__init__()
         
@@ -27,6 +54,35 @@ class PDFDisplay(QWidget):
         
         # PDF文档引用
         self.pdf_document = None
+        self._doc_key = None  # 磁盘缩略图缓存键
+        self._pix_key_prefix = ""  # 内存缓存键前缀，区分不同文档
+        
+        # 已渲染页面缓存 "文档:页码:渲染档位" -> QPixmap
+        QPixmapCache.setCacheLimit(self.PIX_CACHE_LIMIT_KB)
+        
+        # 后台渲染线程池，编号用于丢弃过期的渲染结果
+        self._render_pool = QThreadPool(self)
+        self._render_pool.setMaxThreadCount(min(os.cpu_count() or 1, 4))
+        self._render_generation = 0
+        self._render_band = None  # 当前渲染档位
+        self._last_rendered_zoom = None  # 列表图标对应的缩放比例
+        self._requested_pages = set()  # 当前图标尺寸下已有图标或已提交渲染的页码
+        self._pending_pages = set()  # 已提交、尚未完成渲染的页码
+        
+        # 选择变化通知是否已排队
+        self._selection_emit_pending = False
+        
+        # 滚动时延迟渲染新进入可见区域的页面 (也等待列表完成布局)
+        self._visible_render_timer = QTimer(self)
+        self._visible_render_timer.setSingleShot(True)
+        self._visible_render_timer.setInterval(self.SCROLL_RENDER_DELAY)
+        self._visible_render_timer.timeout.connect(self._render_visible_pages)
+        
+        # 缩放时延迟渲染，重新启动计时器即可合并连续的缩放操作
+        self._zoom_render_timer = QTimer(self)
+        self._zoom_render_timer.setSingleShot(True)
+        self._zoom_render_timer.setInterval(self.ZOOM_RENDER_DELAY)
+        self._zoom_render_timer.timeout.connect(self._apply_zoom_render)
         
         self.init_ui()
         
@@ -79,21 +135,21 @@ class PDFDisplay(QWidget):
         zoom_preset_layout = QHBoxLayout()
         zoom_preset_layout.addWidget(QLabel("快捷:"))
         
-        # 常用缩放比例按钮
-        preset_buttons = [
-            ("50%", 0.5),
-            ("100%", 1.0),
-            ("150%", 1.5),
-            ("200%", 2.0),
-            ("300%", 3.0),
-            ("400%", 4.0)
-        ]
-        
-        for text, zoom_value in preset_buttons:
+        # 常用缩放比例按钮 (共用一个槽函数，按按钮文字查找缩放比例)
+        self._zoom_presets = {
+            "50%": 0.5,
+            "100%": 1.0,
+            "150%": 1.5,
+            "200%": 2.0,
+            "300%": 3.0,
+            "400%": 4.0
+        }
+        
+        for text in self._zoom_presets:
             btn = QPushButton(text)
             btn.setFixedWidth(50)
             btn.setStyleSheet("font-size: 12px; padding: 5px;")
-            btn.clicked.connect(lambda checked, z=zoom_value: self.set_zoom(z))
+            btn.clicked.connect(self._on_zoom_preset)
             zoom_preset_layout.addWidget(btn)
         
         control_layout.addLayout(zoom_preset_layout)
@@ -108,6 +164,7 @@ class PDFDisplay(QWidget):
         self.page_list.setResizeMode(QListWidget.Adjust)
         self.page_list.setSelectionMode(QListWidget.MultiSelection)
         self.page_list.itemSelectionChanged.connect(self.on_page_selection_changed)
+        self.page_list.verticalScrollBar().valueChanged.connect(self._schedule_visible_render)
         
         # 设置页面列表的样式
         self.page_list.setStyleSheet("""
@@ -135,44 +192,93 @@ class PDFDisplay(QWidget):
         
         layout.addWidget(self.page_list)
         
-    def add_page(self, page_num, pixmap):
+    def add_page(self, page_num, pixmap, icon_size=None):
         """添加页面"""
         item = PDFPageItem(page_num, pixmap)
         # 使用当前缩放比例
-        scaled_pixmap = pixmap.scaled(
-            self.page_list.iconSize(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        item.setIcon(QIcon(scaled_pixmap))
+        self._set_item_pixmap(item, pixmap, icon_size or self.page_list.iconSize())
         self.page_list.addItem(item)
         
+    def add_pages(self, pages):
+        """
+        批量添加页面，添加期间暂停重绘和信号
+        
+        参数:
+            pages (list): [(页码, QImage), ...]
+        """
+        self.page_list.setUpdatesEnabled(False)
+        self.page_list.blockSignals(True)
+        try:
+            icon_size = self.page_list.iconSize()
+            for page_num, qimg in pages:
+                # 加载线程只传递QImage，在界面线程转换为QPixmap
+                self.add_page(page_num, QPixmap.fromImage(qimg), icon_size)
+        finally:
+            self.page_list.blockSignals(False)
+            self.page_list.setUpdatesEnabled(True)
+        
     def clear_pages(self):
         """清除所有页面"""
+        self._cancel_rendering()
+        self._render_band = None
+        # 加载线程按当前图标尺寸渲染新页面
+        self._last_rendered_zoom = self.current_zoom
         self.page_list.clear()
         
     def get_page_count(self):
         """获取页面数量"""
         return self.page_list.count()
         
+    def get_icon_width(self):
+        """获取当前预览图标宽度"""
+        return self.page_list.iconSize().width()
+        
+    def get_load_settings(self):
+        """
+        获取首次加载的预览设置：按当前缩放比例所在档位的宽度渲染，与缩放时的渲染共用磁盘缓存
+        
+        返回:
+            tuple: (预览宽度, 文档缓存键, 缓存档位)，超出最高档位时按图标宽度渲染且不缓存
+        """
+        band = self._zoom_band(self.current_zoom)
+        if band not in self.ZOOM_BANDS:
+            return self.get_icon_width(), None, None
+        return int(self.BASE_ICON_WIDTH * band), self._doc_key, band
+        
     def select_pages(self, page_indices):
         """选择指定页面"""
-        self.page_list.clearSelection()
-        
-        for i in range(self.page_list.count()):
-            item = self.page_list.item(i)
-            if isinstance(item, PDFPageItem) and item.page_num in page_indices:
-                item.setSelected(True)
+        # 逐项选择期间屏蔽信号，结束后只通知一次
+        self.page_list.blockSignals(True)
+        try:
+            self.page_list.clearSelection()
+            
+            # 转为集合，每页的查找为O(1)
+            page_indices = set(page_indices)
+            item_at = self.page_list.item
+            for i in range(self.page_list.count()):
+                item = item_at(i)
+                if item.data(Qt.UserRole) in page_indices:
+                    item.setSelected(True)
+        finally:
+            self.page_list.blockSignals(False)
+        self.on_page_selection_changed()
                 
     def clear_selection(self):
         """清除选择"""
         self.page_list.clearSelection()
         
     def on_page_selection_changed(self):
-        """页面选择改变"""
+        """页面选择改变 (同一轮事件循环内的多次变化合并为一次通知)"""
+        if not self._selection_emit_pending:
+            self._selection_emit_pending = True
+            QTimer.singleShot(0, self._emit_selection)
+        
+    def _emit_selection(self):
+        """发送当前选中的页面列表"""
+        self._selection_emit_pending = False
         selected_items = self.page_list.selectedItems()
-        selected_pages = [item.page_num for item in selected_items 
-                         if isinstance(item, PDFPageItem)]
+        selected_pages = [page_num for item in selected_items
+                          if (page_num := item.data(Qt.UserRole)) is not None]
         self.page_selection_changed.emit(selected_pages)
         
     def zoom_in(self):
@@ -208,6 +314,10 @@ class PDFDisplay(QWidget):
         self.current_zoom = 1.0
         self.update_zoom()
         
+    def _on_zoom_preset(self):
+        """快捷缩放按钮点击"""
+        self.set_zoom(self._zoom_presets[self.sender().text()])
+        
     def set_zoom(self, zoom_level):
         """设置缩放比例"""
         self.current_zoom = zoom_level
@@ -215,61 +325,214 @@ class PDFDisplay(QWidget):
         
     def update_zoom(self):
         """更新缩放显示"""
+        # 消除浮点误差 (如 1.2000000000000002)，相同档位不重复渲染
+        self.current_zoom = round(self.current_zoom, 2)
+        
         # 更新缩放标签
         zoom_percent = int(self.current_zoom * 100)
         self.zoom_label.setText(f"{zoom_percent}%")
         
         # 更新图标大小
-        base_width = 200
-        base_height = 250
-        new_width = int(base_width * self.current_zoom)
-        new_height = int(base_height * self.current_zoom)
+        new_width = int(self.BASE_ICON_WIDTH * self.current_zoom)
+        new_height = int(self.BASE_ICON_HEIGHT * self.current_zoom)
         self.page_list.setIconSize(QSize(new_width, new_height))
         
-        # 重新加载当前页面
+        # 延迟重新加载，连续点击缩放时只按最后的缩放比例渲染一次
+        self._zoom_render_timer.start()
+        
+    def _apply_zoom_render(self):
+        """按当前缩放比例重新加载页面"""
         if self.pdf_document and self.pdf_document.doc:
+            if self.current_zoom == self._last_rendered_zoom:
+                return
             self.reload_current_pages()
             
     def reload_current_pages(self):
-        """重新加载当前显示的页面"""
+        """按当前缩放比例更新页面图标 (保留列表项，缓存未命中的页面在后台线程池中渲染)"""
         if not self.pdf_document or not self.pdf_document.doc:
             return
-            
-        # 保存当前选中的页面
-        selected_pages = [item.page_num for item in self.page_list.selectedItems() 
-                         if isinstance(item, PDFPageItem)]
         
-        # 清除当前显示
-        self.page_list.clear()
+        # 跨档位时丢弃旧档位尚未开始的渲染任务，已在进行的结果按编号忽略；
+        # 同一档位内只需按新图标尺寸缩放已渲染的图片
+        band = self._zoom_band(self.current_zoom)
+        if band != self._render_band:
+            self._cancel_rendering()
+            self._render_band = band
+        self._last_rendered_zoom = self.current_zoom
+        placeholder = self._placeholder_icon()
+        requested = set(self._pending_pages)
+        
+        # 只替换图标，列表项、选中状态和滚动位置保持不变；期间暂停重绘
+        self.page_list.setUpdatesEnabled(False)
+        self.page_list.blockSignals(True)
+        try:
+            # 循环内不变的值提前取出
+            icon_size = self.page_list.iconSize()
+            item_at = self.page_list.item
+            cached_pixmap = self._cached_pixmap
+            set_item_pixmap = self._set_item_pixmap
+            for row in range(self.page_list.count()):
+                item = item_at(row)
+                page_num = item.data(Qt.UserRole)
+                if page_num is None:
+                    continue
+                
+                # 已渲染过的档位直接使用缓存
+                pixmap = cached_pixmap(page_num, band)
+                if pixmap is not None:
+                    set_item_pixmap(item, pixmap, icon_size)
+                    requested.add(page_num)
+                elif item.pixmap is not None and not item.pixmap.isNull():
+                    # 先将已有图片缩放为临时图标，进入可见区域时再按新档位渲染
+                    item.setIcon(QIcon(item.pixmap.scaled(
+                        icon_size, Qt.KeepAspectRatio, Qt.FastTransformation)))
+                else:
+                    # 还没有任何图片时显示占位图标
+                    item.setIcon(placeholder)
+        finally:
+            self.page_list.blockSignals(False)
+            self.page_list.setUpdatesEnabled(True)
+        self._requested_pages = requested
+        
+        # 只渲染可见区域及前后少量页面，其余页面滚动到时再渲染
+        # (图标尺寸变化后列表重新布局，布局完成后才能确定可见范围)
+        self._schedule_visible_render()
+        
+    def _schedule_visible_render(self):
+        """延迟渲染可见页面，连续滚动时只在停止后执行一次"""
+        self._visible_render_timer.start()
+        
+    def _render_visible_pages(self):
+        """提交可见区域 (含预渲染范围) 内尚未渲染的页面"""
+        if self._render_band is None:
+            return
+        visible = self._visible_page_range()
+        if visible is None:
+            return
         
-        # 重新加载所有页面
-        for page_num in range(len(self.pdf_document.doc)):
-            page = self.pdf_document.doc[page_num]
-            # 使用当前缩放比例渲染页面
-            mat = fitz.Matrix(1.5 * self.current_zoom, 1.5 * self.current_zoom)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # 转换为QPixmap
-            img_data = pix.tobytes("png")
-            from PyQt5.QtGui import QImage
-            qimg = QImage()
-            qimg.loadFromData(img_data)
-            pixmap = QPixmap.fromImage(qimg)
-            
-            # 创建列表项
-            item = PDFPageItem(page_num, pixmap)
-            scaled_pixmap = pixmap.scaled(
-                self.page_list.iconSize(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            item.setIcon(QIcon(scaled_pixmap))
-            self.page_list.addItem(item)
-            
-            # 恢复选中状态
-            if page_num in selected_pages:
-                item.setSelected(True)
+        first, last = visible
+        
+        # 按档位对应的图标尺寸渲染
+        band = self._render_band
+        target_size = (int(self.BASE_ICON_WIDTH * band), int(self.BASE_ICON_HEIGHT * band))
+        pdf_path = self.pdf_document.pdf_path
+        doc_key = self._doc_key
+        generation = self._render_generation
+        requested = self._requested_pages
+        for page_num, priority in self._render_order(first, last):
+            if page_num in requested:
+                continue
+            requested.add(page_num)
+            self._pending_pages.add(page_num)
+            cache_path = thumbnail_path(doc_key, page_num, band)
+            task = PageRenderTask(generation, pdf_path, page_num, target_size, cache_path)
+            task.signals.page_rendered.connect(self._on_page_rendered)
+            self._render_pool.start(task, priority)
+        
+    def _render_order(self, first, last):
+        """
+        生成渲染顺序：先可见页面 (从上到下)，再按距离由近到远的预渲染页面
+        
+        返回:
+            list: [(页码, 线程池优先级), ...]
+        """
+        order = [(page_num, self.VISIBLE_RENDER_PRIORITY) for page_num in range(first, last + 1)]
+        count = self.page_list.count()
+        for distance in range(1, self.PREFETCH_PAGES + 1):
+            if last + distance < count:
+                order.append((last + distance, self.PREFETCH_RENDER_PRIORITY))
+            if first - distance >= 0:
+                order.append((first - distance, self.PREFETCH_RENDER_PRIORITY))
+        return order
+        
+    def _visible_page_range(self):
+        """获取视口内可见的首行和末行，列表为空时返回None"""
+        count = self.page_list.count()
+        if count == 0:
+            return None
+        
+        # 图标模式下各行按从上到下排列，可用二分查找定位
+        height = self.page_list.viewport().height()
+        first = self._first_row_where(count, lambda rect: rect.bottom() >= 0)
+        last = self._first_row_where(count, lambda rect: rect.top() > height) - 1
+        if first > last:
+            return None
+        return first, last
+        
+    def _first_row_where(self, count, predicate):
+        """二分查找第一个满足条件的行号 (条件随行号单调)，都不满足时返回count"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if predicate(self.page_list.visualItemRect(self.page_list.item(mid))):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+        
+    def _on_page_rendered(self, generation, page_num, qimg):
+        """后台渲染完成，替换对应页面的图标"""
+        if generation != self._render_generation:
+            return
+        
+        self._pending_pages.discard(page_num)
+        pixmap = QPixmap.fromImage(qimg)
+        QPixmapCache.insert(self._pix_cache_key(page_num, self._render_band), pixmap)
+        
+        # 列表项按页码顺序排列
+        item = self.page_list.item(page_num)
+        if item is not None and item.data(Qt.UserRole) == page_num:
+            self._set_item_pixmap(item, pixmap, self.page_list.iconSize())
+        
+    def _set_item_pixmap(self, item, pixmap, icon_size):
+        """按图标尺寸设置列表项图标"""
+        if pixmap.width() > icon_size.width() or pixmap.height() > icon_size.height():
+            # 仅在图片大于图标尺寸时缩放 (按图标尺寸渲染的页面可直接使用)
+            # 小图标上平滑缩放与快速缩放差别不明显，使用更快的方式
+            if icon_size.width() >= self.SMOOTH_SCALE_MIN_WIDTH:
+                mode = Qt.SmoothTransformation
+            else:
+                mode = Qt.FastTransformation
+            pixmap = pixmap.scaled(icon_size, Qt.KeepAspectRatio, mode)
+        # 列表项只保留图标尺寸的图片，档位原图仅由内存缓存持有，内存占用受缓存上限约束
+        item.pixmap = pixmap
+        item.setIcon(QIcon(pixmap))
+        
+    def _zoom_band(self, zoom):
+        """获取缩放比例对应的渲染档位 (超出最高档位时按实际缩放比例渲染)"""
+        for band in self.ZOOM_BANDS:
+            if band >= zoom:
+                return band
+        return zoom
+        
+    def _placeholder_icon(self):
+        """渲染完成前显示的空白图标，保持列表布局稳定"""
+        placeholder = QPixmap(self.page_list.iconSize())
+        placeholder.fill(Qt.white)
+        return QIcon(placeholder)
+        
+    def _cancel_rendering(self):
+        """取消进行中的后台渲染"""
+        self._render_generation += 1
+        self._render_pool.clear()
+        self._requested_pages.clear()
+        self._pending_pages.clear()
+        
+    def _pix_cache_key(self, page_num, band):
+        """内存缓存键"""
+        return f"{self._pix_key_prefix}:{page_num}:{int(band * 100)}"
+        
+    def _cached_pixmap(self, page_num, band):
+        """从内存缓存获取已渲染的页面，未命中时返回None"""
+        pixmap = QPixmapCache.find(self._pix_cache_key(page_num, band))
+        if pixmap is None or pixmap.isNull():
+            return None
+        return pixmap
         
     def set_pdf_document(self, pdf_document):
         """设置PDF文档引用"""
-        self.pdf_document = pdf_document 
\ No newline at end of file
+        self.pdf_document = pdf_document
+        self._doc_key = document_key(pdf_document.pdf_path) if pdf_document.pdf_path else None
+        touch_document(self._doc_key)
+        # 缓存键包含文档标识，切换文档后旧条目不会命中，由缓存自行淘汰
+        self._pix_key_prefix = self._doc_key or pdf_document.pdf_path or "" 
\ No newline at end of file
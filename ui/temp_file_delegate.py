@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+临时文件列表绘制代理
+"""
+
+from PyQt5.QtWidgets import QStyledItemDelegate
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPixmap, QPainter, QPen, QColor
+
+from models.temp_files_model import ExistsRole
+
+
+class TempFileDelegate(QStyledItemDelegate):
+    """已删除的文件直接绘制预先生成的标记图和文字，正常文件使用默认绘制"""
+    
+    MARK_SIZE = 12
+    MARK_MARGIN = 4
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 删除标记只生成一次，绘制时直接贴图
+        self._cross_pix = self._create_cross_pixmap(self.MARK_SIZE)
+        self._deleted_color = QColor("#999999")
+    
+    @staticmethod
+    def _create_cross_pixmap(size):
+        """生成红色叉号标记"""
+        pix = QPixmap(size, size)
+        pix.fill(Qt.transparent)
+        painter = QPainter(pix)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor("#E53935"), 2))
+        painter.drawLine(2, 2, size - 2, size - 2)
+        painter.drawLine(2, size - 2, size - 2, 2)
+        painter.end()
+        return pix
+    
+    def paint(self, painter, option, index):
+        if index.data(ExistsRole):
+            super().paint(painter, option, index)
+            return
+        
+        rect = option.rect
+        mark_top = rect.top() + (rect.height() - self.MARK_SIZE) // 2
+        painter.drawPixmap(rect.left() + self.MARK_MARGIN, mark_top, self._cross_pix)
+        
+        text_rect = QRect(rect).adjusted(self.MARK_SIZE + 2 * self.MARK_MARGIN, 0, 0, 0)
+        painter.save()
+        painter.setPen(self._deleted_color)
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft,
+                         f"{index.data(Qt.DisplayRole)} (已删除)")
+        painter.restore()
\ No newline at end of file